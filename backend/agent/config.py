@@ -6,6 +6,8 @@
 '''
 
 import os
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Literal, Optional
 
 from pydantic import Field, field_validator
@@ -36,13 +38,99 @@ class AgentConfig(BaseSettings):
     mcp_max_retries: int = Field(
         default=3,
         ge=1,
-        description='Максимальное количество попыток для MCP API'
+        description=(
+            'Максимальное количество попыток вызова MCP инструмента '
+            'при таймауте или потере соединения с MCP сервером'
+        )
     )
     mcp_cache_ttl: int = Field(
         default=300,
         ge=0,
         description='TTL кэша MCP ответов в секундах'
     )
+    mcp_negative_cache_ttl: int = Field(
+        default=30,
+        ge=0,
+        description=(
+            'TTL кэша ошибок MCP (неизвестный инструмент, '
+            'ошибка валидации) в секундах'
+        )
+    )
+    mcp_cache_max: int = Field(
+        default=1024,
+        ge=1,
+        description='Максимальное количество записей в кэше MCP ответов'
+    )
+    mcp_rag_cache_max: int = Field(
+        default=512,
+        ge=1,
+        description='Максимальное количество ответов compliance_rag в кэше'
+    )
+    mcp_disk_cache_dir: str = Field(
+        default='',
+        description=(
+            'Каталог дискового кэша ответов compliance_rag '
+            '(пусто - отключен)'
+        )
+    )
+    mcp_rag_disk_ttl: int = Field(
+        default=86400,
+        ge=1,
+        description='TTL дискового кэша compliance_rag в секундах'
+    )
+    mcp_max_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description='Максимальное количество одновременных вызовов MCP'
+    )
+    mcp_http2: bool = Field(
+        default=True,
+        description='Использовать HTTP/2 для соединений с MCP сервером'
+    )
+    mcp_connect_timeout: float = Field(
+        default=5.0,
+        gt=0,
+        description='Таймаут установки соединения с MCP сервером в секундах'
+    )
+    mcp_max_connections: int = Field(
+        default=32,
+        ge=1,
+        description='Максимальное количество соединений с MCP сервером'
+    )
+    mcp_max_keepalive_connections: int = Field(
+        default=16,
+        ge=0,
+        description='Максимальное количество keep-alive соединений с MCP'
+    )
+    mcp_keepalive_expiry: float = Field(
+        default=60.0,
+        ge=0,
+        description='Время жизни простаивающего соединения с MCP в секундах'
+    )
+    mcp_enable_batching: bool = Field(
+        default=False,
+        description=(
+            'Объединять близкие по времени вызовы MCP инструментов '
+            'в один вызов batch_call'
+        )
+    )
+    mcp_batch_window_ms: float = Field(
+        default=5.0,
+        gt=0,
+        description='Окно накопления вызовов для batch_call в миллисекундах'
+    )
+    mcp_batch_max_size: int = Field(
+        default=16,
+        ge=1,
+        description='Максимальное количество вызовов в одном batch_call'
+    )
+    mcp_redis_url: str = Field(
+        default='',
+        description=(
+            'URL Redis для общего L2 кэша ответов MCP '
+            '(пусто - отключен)'
+        )
+    )
 
     # MCP Security Configuration
     mcp_auth_enabled: bool = Field(
@@ -205,45 +293,51 @@ class AgentConfig(BaseSettings):
         return value.rstrip('/')
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> AgentConfig:
+    '''Получить настройки (.env читается один раз за процесс).'''
+    return AgentConfig()
+
+
 # Global settings instance
-settings = AgentConfig()
+settings = get_settings()
 
 
 # Agent role configurations
 class AgentRoles:
-    '''Определения ролей агентов и их целей.'''
+    '''Определения ролей агентов и их целей (неизменяемые).'''
 
-    CLASSIFIER = {
+    CLASSIFIER = MappingProxyType({
         'name': 'Query Classifier',
         'description': 'Классифицирует запросы и определяет нужных агентов',
         'temperature': 0.0,
-    }
+    })
 
-    REPAIR_DAYS = {
+    REPAIR_DAYS = MappingProxyType({
         'name': 'Repair Days Tracker',
         'description': 'Анализирует дни простоя и прогнозирует риски',
         'temperature': 0.0,
-    }
+    })
 
-    COMPLIANCE = {
+    COMPLIANCE = MappingProxyType({
         'name': 'Warran(ty Compliance',
         'description': (
             'Интерпретирует гарантийную политику и стандарты клиентской службы'
         ),
         'temperature': 0.0,
-    }
+    })
 
-    DEALER_INSIGHTS = {
+    DEALER_INSIGHTS = MappingProxyType({
         'name': 'Dealer Insights',
         'description': 'Анализирует историю ремонтов и выявляет паттерны',
         'temperature': 0.0,
-    }
+    })
 
-    REPORT_SUMMARY = {
+    REPORT_SUMMARY = MappingProxyType({
         'name': 'Report & Summary',
         'description': 'Генерирует итоговые отчёты и справки',
         'temperature': 0.0,
-    }
+    })
 
 
 # MCP Tool names
@@ -251,21 +345,27 @@ class MCPTools:
     '''Идентификаторы MCP инструментов.'''
 
     WARRANTY_DAYS = 'warranty_days'
+    WARRANTY_DAYS_BATCH = 'warranty_days_batch'
     WARRANTY_HISTORY = 'warranty_history'
     MAINTENANCE_HISTORY = 'maintenance_history'
     VEHICLE_REPAIRS_HISTORY = 'vehicle_repairs_history'
     COMPLIANCE_RAG = 'compliance_rag'
+    BATCH_CALL = 'batch_call'
+
+    _ALL_TOOLS = (
+        WARRANTY_DAYS,
+        WARRANTY_DAYS_BATCH,
+        WARRANTY_HISTORY,
+        MAINTENANCE_HISTORY,
+        VEHICLE_REPAIRS_HISTORY,
+        COMPLIANCE_RAG,
+        BATCH_CALL,
+    )
 
     @classmethod
-    def all_tools(cls) -> list[str]:
-        '''Возвращает список всех доступных MCP инструментов.'''
-        return [
-            cls.WARRANTY_DAYS,
-            cls.WARRANTY_HISTORY,
-            cls.MAINTENANCE_HISTORY,
-            cls.VEHICLE_REPAIRS_HISTORY,
-            cls.COMPLIANCE_RAG,
-        ]
+    def all_tools(cls) -> tuple[str, ...]:
+        '''Возвращает все доступные MCP инструменты.'''
+        return cls._ALL_TOOLS
 
 
 # Graph node names
@@ -5,6 +5,7 @@
 какие агенты должны быть вызваны.
 '''
 
+import asyncio
 import json
 import re
 
@@ -13,7 +14,12 @@ from loguru import logger
 from agent.graph.state import AgentState, AgentClassification
 from agent.llm.gigachat_setup import get_classifier_llm
 from agent.llm.prompts import get_classifier_prompt
-from agent.config import GraphNodes
+from agent.config import GraphNodes, MCPTools
+from agent.tools.mcp_client import get_mcp_client
+
+
+# Задачи прогрева кэша MCP: ссылки удерживаются до завершения задач
+_prewarm_tasks: set[asyncio.Task[None]] = set()
 
 
 async def classifier_node(state: AgentState) -> AgentState:
@@ -67,6 +73,8 @@ async def classifier_node(state: AgentState) -> AgentState:
             state.vin = classification.vin
             logger.info(f'VIN извлечен из запроса: {classification.vin}')
 
+        _start_prewarm(state)
+
         # Mark step completed
         state.mark_step_completed(GraphNodes.CLASSIFIER)
 
@@ -99,6 +107,43 @@ async def classifier_node(state: AgentState) -> AgentState:
         return state
 
 
+def _start_prewarm(state: AgentState) -> None:
+    '''
+    Запустить фоновый прогрев кэша MCP для VIN из запроса.
+
+    Данные для выбранных VIN-агентов запрашиваются параллельно, пока
+    выполняются предыдущие узлы графа: узлы получают ответы из кэша
+    или присоединяются к уже выполняющемуся запросу.
+
+    Args:
+        state: Состояние агента с результатом классификации
+    '''
+    classification = state.classification
+    tools: list[str] = []
+    if classification.needs_repair_days:
+        tools.append(MCPTools.WARRANTY_DAYS)
+    if classification.needs_dealer_insights:
+        tools.extend((
+            MCPTools.WARRANTY_HISTORY,
+            MCPTools.MAINTENANCE_HISTORY,
+            MCPTools.VEHICLE_REPAIRS_HISTORY,
+        ))
+    if not state.vin or not tools:
+        return
+    task = asyncio.create_task(_prewarm(state.vin, tuple(tools)))
+    _prewarm_tasks.add(task)
+    task.add_done_callback(_prewarm_tasks.discard)
+
+
+async def _prewarm(vin: str, tools: tuple[str, ...]) -> None:
+    '''Прогреть кэш MCP; ошибки только логируются.'''
+    try:
+        client = await get_mcp_client()
+        await client.prewarm([vin], tools)
+    except Exception as e:
+        logger.warning(f'Прогрев кэша MCP для VIN {vin} не удался: {e}')
+
+
 def _parse_classification_response(response: str) -> dict:
     '''
     Парсинг ответа классификатора LLM в структурированные данные.
@@ -12,7 +12,7 @@ from agent.graph.state import AgentState, AgentResult
 from agent.llm.gigachat_setup import get_dealer_insights_llm
 from agent.llm.prompts import get_dealer_insights_prompt
 from agent.tools.mcp_client import get_mcp_client
-from agent.config import GraphNodes, AgentRoles
+from agent.config import GraphNodes, AgentRoles, MCPTools
 
 
 async def dealer_insights_node(state: AgentState) -> AgentState:
@@ -46,9 +46,17 @@ async def dealer_insights_node(state: AgentState) -> AgentState:
         # Fetch all relevant data
         logger.debug(f'Получение данных истории ремонтов для VIN: {state.vin}')
 
-        warranty_history = await client.warranty_history(state.vin)
-        maintenance_history = await client.maintenance_history(state.vin)
-        repairs_history = await client.vehicle_repairs_history(state.vin)
+        responses = await client.fetch_all(
+            state.vin,
+            tools=(
+                MCPTools.WARRANTY_HISTORY,
+                MCPTools.MAINTENANCE_HISTORY,
+                MCPTools.VEHICLE_REPAIRS_HISTORY,
+            ),
+        )
+        warranty_history = responses[MCPTools.WARRANTY_HISTORY]
+        maintenance_history = responses[MCPTools.MAINTENANCE_HISTORY]
+        repairs_history = responses[MCPTools.VEHICLE_REPAIRS_HISTORY]
 
         # Check for errors
         errors = []
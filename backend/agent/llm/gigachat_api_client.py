@@ -23,12 +23,19 @@ Api-Key аутентификации.
     print(response.content)
 '''
 
+import asyncio
 from typing import Any, Optional
 
 import httpx
+import orjson
 from loguru import logger
 
 
+# Ответы API больше этого размера (в байтах) разбираются в отдельном
+# потоке, чтобы не блокировать event loop
+_JSON_THREAD_THRESHOLD = 256_000
+
+
 class GigaChatAPIError(Exception):
     '''Базовое исключение для ошибок GigaChat API.'''
 
@@ -206,7 +213,7 @@ class GigaChatAPIClient:
                         'Content-Type': 'application/json',
                         'Authorization': f'Api-Key {self.api_key}',
                     },
-                    json=payload,
+                    content=orjson.dumps(payload),
                 )
 
                 logger.info(f'Response status: {response.status_code}')
@@ -214,7 +221,11 @@ class GigaChatAPIClient:
                     logger.error(f'Response body: {response.text[:500]}')
 
                 response.raise_for_status()
-                result = response.json()
+                raw = response.content
+                if len(raw) > _JSON_THREAD_THRESHOLD:
+                    result = await asyncio.to_thread(orjson.loads, raw)
+                else:
+                    result = orjson.loads(raw)
 
                 logger.debug(f'Full API response: {result}')
 
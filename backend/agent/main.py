@@ -2,14 +2,22 @@
 Главная точка входа для системы агента гарантийных претензий.
 
 Этот модуль предоставляет CLI интерфейс и запускает FastAPI сервер.
+Если установлен uvloop, он используется как event loop (uvicorn
+подключает его автоматически, для CLI режима - через loop_factory).
 '''
 
 import sys
 import asyncio
+from collections.abc import Callable
 from typing import Optional
 import uvicorn
 from loguru import logger
 
+try:
+    import uvloop
+except ImportError:  # uvloop недоступен на Windows
+    uvloop = None
+
 from agent.config import settings
 from agent.graph import execute_query
 from agent.tools.mcp_client import close_mcp_client
@@ -99,6 +107,11 @@ async def test_query(query: str, vin: Optional[str] = None) -> None:
         await close_mcp_client()
 
 
+def event_loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    '''Фабрика uvloop event loop или None для стандартного asyncio.'''
+    return uvloop.new_event_loop if uvloop is not None else None
+
+
 def run_server() -> None:
     '''Запуск FastAPI сервера.'''
     logger.info(
@@ -140,7 +153,9 @@ def main() -> None:
             query = sys.argv[2]
             vin = sys.argv[3] if len(sys.argv) > 3 else None
 
-            asyncio.run(test_query(query, vin))
+            asyncio.run(
+                test_query(query, vin), loop_factory=event_loop_factory()
+            )
 
         else:
             print(f'Неизвестная команда: {command}')
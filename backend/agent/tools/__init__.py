@@ -1,14 +1,12 @@
 '''Tools package for warranty agent system.'''
 
+from typing import Any
+
 from agent.tools.mcp_client import (
     MCPClient,
     get_mcp_client,
     close_mcp_client,
 )
-from agent.tools.langchain_tools import (
-    get_all_tools,
-    get_tool_by_name,
-)
 
 __all__ = [
     'MCPClient',
@@ -17,3 +15,17 @@ __all__ = [
     'get_all_tools',
     'get_tool_by_name',
 ]
+
+
+def __getattr__(name: str) -> Any:
+    '''
+    Ленивый импорт LangChain инструментов.
+
+    Модуль langchain_tools тянет LangChain и строит Pydantic схемы,
+    поэтому загружается только при первом обращении к инструментам.
+    '''
+    if name in ('get_all_tools', 'get_tool_by_name'):
+        from agent.tools import langchain_tools
+
+        return getattr(langchain_tools, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,109 @@
+'''
+Кэш ответов MCP инструментов с вытеснением с учетом ценности записей.
+
+Ключи кэша - кортежи, первый элемент которых - название инструмента
+(см. MCPClient). Ценность инструмента задается таблицей tool_values:
+дорогие или редко меняющиеся ответы вытесняются последними.
+'''
+
+import heapq
+import math
+import time
+from collections.abc import Callable, Hashable, Mapping
+from typing import Any
+
+from cachetools import TTLCache
+
+
+# Сглаживающая добавка в оценке log(v + h + δ)
+_SCORE_DELTA = 1e-3
+
+
+class ValueAwareTTLCache(TTLCache):
+    '''
+    TTLCache с value-aware вытеснением (v-LRU).
+
+    Истекшие записи удаляются по TTL как в обычном TTLCache. Когда кэш
+    заполнен, среди scan_fraction давно не использованных записей
+    вытесняется запись с минимальной оценкой log(v + h + δ), где
+    v - ценность инструмента, h - доля попаданий по ключу.
+    '''
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        tool_values: Mapping[str, float],
+        timer: Callable[[], float] = time.monotonic,
+        default_value: float = 1.0,
+        scan_fraction: float = 0.1,
+    ) -> None:
+        '''
+        Инициализация кэша.
+
+        Args:
+            maxsize: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+            tool_values: Ценность записей по названию инструмента
+            timer: Источник времени (монотонный)
+            default_value: Ценность инструментов, отсутствующих в таблице
+            scan_fraction: Доля давно не использованных записей,
+            среди которых выбирается вытесняемая
+        '''
+        super().__init__(maxsize, ttl, timer)
+        self._tool_values = tool_values
+        self._default_value = default_value
+        self._scan_fraction = scan_fraction
+        # Статистика по ключу: [попадания, промахи, время доступа]
+        self._stats: dict[Hashable, list[float]] = {}
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = super().__getitem__(key)
+        stats = self._stats.get(key)
+        if stats is not None:
+            stats[0] += 1
+            stats[2] = self.timer()
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        super().__setitem__(key, value)
+        # Запись в кэш следует за промахом
+        stats = self._stats.setdefault(key, [0, 0, 0.0])
+        stats[1] += 1
+        stats[2] = self.timer()
+
+    def __delitem__(self, key: Hashable) -> None:
+        super().__delitem__(key)
+        self._stats.pop(key, None)
+
+    def expire(self, time: Any = None) -> list[tuple[Hashable, Any]]:
+        '''Удалить истекшие записи вместе с их статистикой.'''
+        expired = super().expire(time)
+        for key, _ in expired:
+            self._stats.pop(key, None)
+        return expired
+
+    def clear(self) -> None:
+        '''Очистить кэш без поиска вытесняемых записей.'''
+        self._stats.clear()
+        super().clear()
+
+    def popitem(self) -> tuple[Hashable, Any]:
+        '''Вытеснить наименее ценную из давно не использованных записей.'''
+        if not self._stats:
+            return super().popitem()
+
+        count = max(1, int(len(self._stats) * self._scan_fraction))
+        candidates = heapq.nsmallest(
+            count, self._stats.items(), key=lambda item: item[1][2]
+        )
+        key = min(candidates, key=lambda item: self._score(*item))[0]
+        return key, self.pop(key)
+
+    def _score(self, key: Hashable, stats: list[float]) -> float:
+        '''Оценка записи log(v + h + δ): чем меньше, тем раньше вытеснение.'''
+        hits, misses, _ = stats
+        tool_name = key[0] if isinstance(key, tuple) else key
+        value = self._tool_values.get(tool_name, self._default_value)
+        hit_ratio = hits / (hits + misses) if hits + misses else 0.0
+        return math.log(value + hit_ratio + _SCORE_DELTA)
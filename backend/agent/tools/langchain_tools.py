@@ -5,7 +5,9 @@ LangChain инструменты для MCP сервера.
 для использования с LangGraph агентами.
 '''
 
-from typing import Any, Optional
+import functools
+import textwrap
+from typing import Any, Awaitable, Callable, Optional
 
 from langchain.tools import BaseTool
 from langchain.callbacks.manager import CallbackManagerForToolRun
@@ -13,11 +15,110 @@ from loguru import logger
 from pydantic import BaseModel, Field
 
 from agent.tools.mcp_client import get_mcp_client
-from agent.utils.vin_validator import validate_vin
+from agent.utils.vin_validator import validate_and_normalize_vin
 
 
-class WarrantyDaysInput(BaseModel):
-    '''Схема входных данных для инструмента warranty_days.'''
+# Описания инструментов передаются в LLM при каждом вызове,
+# поэтому храним их без отступов исходного кода
+_WARRANTY_DAYS_DESC = textwrap.dedent('''
+    Получить статистику дней простоя автомобиля в ремонте по годам.
+    Используй этот инструмент для анализа:
+    - Сколько дней в году автомобиль находился в ремонте
+    - Соблюдения 30-дневного лимита по закону о защите прав потребителей
+    - Прогнозирования рисков превышения лимита
+
+    Входные данные: VIN автомобиля (17 символов)
+''').strip()
+
+_WARRANTY_DAYS_BATCH_DESC = textwrap.dedent('''
+    Получить статистику дней простоя в ремонте сразу для нескольких
+    автомобилей за один вызов.
+    Используй этот инструмент вместо нескольких вызовов warranty_days,
+    когда нужно проанализировать группу автомобилей (автопарк).
+
+    Входные данные: список VIN автомобилей
+''').strip()
+
+_WARRANTY_HISTORY_DESC = textwrap.dedent('''
+    Получить полную историю гарантийных обращений автомобиля.
+    Используй этот инструмент для:
+    - Просмотра всех гарантийных ремонтов
+    - Анализа типов неисправностей
+    - Изучения дат и периодов ремонтов
+
+    Входные данные: VIN автомобиля
+''').strip()
+
+_MAINTENANCE_HISTORY_DESC = textwrap.dedent('''
+    Получить историю технического обслуживания (ТО) автомобиля.
+    Используй этот инструмент для:
+    - Просмотра всех проведённых ТО
+    - Проверки соблюдения регламента обслуживания
+    - Анализа регулярности обслуживания
+
+    Входные данные: VIN автомобиля
+''').strip()
+
+_VEHICLE_REPAIRS_HISTORY_DESC = textwrap.dedent('''
+    Получить полную историю всех ремонтов автомобиля в дилерской сети.
+    Используй этот инструмент для:
+    - Комплексного анализа всех ремонтов (гарантийных и платных)
+    - Выявления повторяющихся проблем
+    - Анализа работы дилерских центров
+    - Поиска паттернов неисправностей
+
+    Входные данные: VIN автомобиля
+''').strip()
+
+_COMPLIANCE_RAG_DESC = textwrap.dedent('''
+    Поиск информации в базе знаний гарантийной политики
+    и стандартов клиентской службы дилера.
+    Используй этот инструмент для:
+    - Интерпретации условий гарантии
+    - Поиска релевантных статей стандартов клиентской службы дилера
+    - Объяснения действий клиентской службы дилера
+    - Получения информации о гарантийных обязательствах
+
+    Входные данные: текстовый запрос на русском языке
+''').strip()
+
+
+_ToolCoroutine = Callable[..., Awaitable[dict[str, Any]]]
+
+
+def mcp_safe(arg_name: str) -> Callable[[_ToolCoroutine], _ToolCoroutine]:
+    '''
+    Декоратор обработки ошибок для асинхронных методов инструментов.
+
+    Перехватывает исключения MCP вызова, логирует их и возвращает
+    словарь с ошибкой вместо исключения.
+
+    Args:
+        arg_name: Название входного аргумента инструмента (vin или query)
+
+    Returns:
+        Декоратор для метода _arun
+    '''
+
+    def decorator(fn: _ToolCoroutine) -> _ToolCoroutine:
+        @functools.wraps(fn)
+        async def wrapper(
+            self: BaseTool, *args: Any, **kwargs: Any
+        ) -> dict[str, Any]:
+            try:
+                return await fn(self, *args, **kwargs)
+            except Exception as e:
+                logger.error(f'Ошибка при выполнении {self.name}: {e}')
+                value = kwargs.get(arg_name, args[0] if args else None)
+                return {'error': str(e), arg_name: value}
+
+        return wrapper
+
+    return decorator
+
+
+class VINInput(BaseModel):
+    '''Схема входных данных для инструментов, принимающих VIN.'''
 
     vin: str = Field(
         description='VIN автомобиля (17 символов, латинские буквы и цифры)'
@@ -28,16 +129,8 @@ class WarrantyDaysTool(BaseTool):
     '''Инструмент для получения статистики дней простоя автомобиля в ремонте'''
 
     name: str = 'warranty_days'
-    description: str = '''
-    Получить статистику дней простоя автомобиля в ремонте по годам.
-    Используй этот инструмент для анализа:
-    - Сколько дней в году автомобиль находился в ремонте
-    - Соблюдения 30-дневного лимита по закону о защите прав потребителей
-    - Прогнозирования рисков превышения лимита
-
-    Входные данные: VIN автомобиля (17 символов)
-    '''
-    args_schema: type[BaseModel] = WarrantyDaysInput
+    description: str = _WARRANTY_DAYS_DESC
+    args_schema: type[BaseModel] = VINInput
 
     def _run(
         self,
@@ -47,6 +140,7 @@ class WarrantyDaysTool(BaseTool):
         '''Синхронная версия - не реализована.'''
         raise NotImplementedError('Используй асинхронную версию (ainvoke)')
 
+    @mcp_safe('vin')
     async def _arun(
         self,
         vin: str,
@@ -63,41 +157,76 @@ class WarrantyDaysTool(BaseTool):
             Статистика дней простоя автомобиля в ремонте
         '''
         # Validate VIN
-        is_valid, error_msg = validate_vin(vin)
+        is_valid, error_msg, vin = validate_and_normalize_vin(vin)
         if not is_valid:
             logger.warning(f'Неверный VIN: {vin}, ошибка: {error_msg}')
             return {'error': error_msg, 'vin': vin}
 
-        try:
-            client = await get_mcp_client()
-            result = await client.warranty_days(vin)
-            logger.info(f'warranty_days выполнен для VIN: {vin}')
-            return result
-        except Exception as e:
-            logger.error(f'Ошибка при выполнении warranty_days: {e}')
-            return {'error': str(e), 'vin': vin}
+        client = await get_mcp_client()
+        result = await client.warranty_days(vin)
+        logger.info(f'warranty_days выполнен для VIN: {vin}')
+        return result
+
 
+class VINListInput(BaseModel):
+    '''Схема входных данных для инструмента warranty_days_batch.'''
 
-class WarrantyHistoryInput(BaseModel):
-    '''Схема входных данных для инструмента warranty_history.'''
+    vins: list[str] = Field(description='Список VIN автомобилей')
 
-    vin: str = Field(description='VIN автомобиля')
+
+class WarrantyDaysBatchTool(BaseTool):
+    '''Инструмент для получения дней простоя по нескольким автомобилям.'''
+
+    name: str = 'warranty_days_batch'
+    description: str = _WARRANTY_DAYS_BATCH_DESC
+    args_schema: type[BaseModel] = VINListInput
+
+    def _run(
+        self,
+        vins: list[str],
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> dict[str, Any]:
+        '''Синхронная версия - не реализована.'''
+        raise NotImplementedError('Используй асинхронную версию (ainvoke)')
+
+    @mcp_safe('vins')
+    async def _arun(
+        self,
+        vins: list[str],
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> dict[str, Any]:
+        '''Асинхронное выполнение инструмента warranty_days_batch.'''
+        results: dict[str, Any] = {}
+        valid_vins = []
+        for raw_vin in vins:
+            is_valid, error_msg, vin = validate_and_normalize_vin(raw_vin)
+            if is_valid:
+                valid_vins.append(vin)
+            else:
+                logger.warning(f'Неверный VIN: {vin}, ошибка: {error_msg}')
+                results[vin] = {'error': error_msg, 'vin': vin}
+
+        if valid_vins:
+            client = await get_mcp_client()
+            batch = await client.warranty_days_batch(valid_vins)
+            for vin, result in batch.items():
+                if isinstance(result, Exception):
+                    # Та же ошибка, что вернул бы warranty_days (mcp_safe)
+                    logger.error(
+                        f'Ошибка при выполнении warranty_days: {result}'
+                    )
+                    result = {'error': str(result), 'vin': vin}
+                results[vin] = result
+        logger.info(f'warranty_days_batch выполнен для {len(vins)} VIN')
+        return results
 
 
 class WarrantyHistoryTool(BaseTool):
     '''Инструмент для получения истории гарантийных обращений автомобиля.'''
 
     name: str = 'warranty_history'
-    description: str = '''
-    Получить полную историю гарантийных обращений автомобиля.
-    Используй этот инструмент для:
-    - Просмотра всех гарантийных ремонтов
-    - Анализа типов неисправностей
-    - Изучения дат и периодов ремонтов
-
-    Входные данные: VIN автомобиля
-    '''
-    args_schema: type[BaseModel] = WarrantyHistoryInput
+    description: str = _WARRANTY_HISTORY_DESC
+    args_schema: type[BaseModel] = VINInput
 
     def _run(
         self,
@@ -107,47 +236,30 @@ class WarrantyHistoryTool(BaseTool):
         '''Синхронная версия - не реализована.'''
         raise NotImplementedError('Используй асинхронную версию (ainvoke)')
 
+    @mcp_safe('vin')
     async def _arun(
         self,
         vin: str,
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> dict[str, Any]:
         '''Асинхронное выполнение инструмента warranty_history.'''
-        is_valid, error_msg = validate_vin(vin)
+        is_valid, error_msg, vin = validate_and_normalize_vin(vin)
         if not is_valid:
             logger.warning(f'Неверный VIN: {vin}, ошибка: {error_msg}')
             return {'error': error_msg, 'vin': vin}
 
-        try:
-            client = await get_mcp_client()
-            result = await client.warranty_history(vin)
-            logger.info(f'warranty_history выполнен для VIN: {vin}')
-            return result
-        except Exception as e:
-            logger.error(f'Ошибка при выполнении warranty_history: {e}')
-            return {'error': str(e), 'vin': vin}
-
-
-class MaintenanceHistoryInput(BaseModel):
-    '''Схема входных данных для инструмента maintenance_history.'''
-
-    vin: str = Field(description='VIN автомобиля')
+        client = await get_mcp_client()
+        result = await client.warranty_history(vin)
+        logger.info(f'warranty_history выполнен для VIN: {vin}')
+        return result
 
 
 class MaintenanceHistoryTool(BaseTool):
     '''Инструмент для получения истории технического обслуживания автомобиля'''
 
     name: str = 'maintenance_history'
-    description: str = '''
-    Получить историю технического обслуживания (ТО) автомобиля.
-    Используй этот инструмент для:
-    - Просмотра всех проведённых ТО
-    - Проверки соблюдения регламента обслуживания
-    - Анализа регулярности обслуживания
-
-    Входные данные: VIN автомобиля
-    '''
-    args_schema: type[BaseModel] = MaintenanceHistoryInput
+    description: str = _MAINTENANCE_HISTORY_DESC
+    args_schema: type[BaseModel] = VINInput
 
     def _run(
         self,
@@ -157,31 +269,22 @@ class MaintenanceHistoryTool(BaseTool):
         '''Синхронная версия - не реализована.'''
         raise NotImplementedError('Используй асинхронную версию (ainvoke)')
 
+    @mcp_safe('vin')
     async def _arun(
         self,
         vin: str,
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> dict[str, Any]:
         '''Асинхронное выполнение инструмента maintenance_history.'''
-        is_valid, error_msg = validate_vin(vin)
+        is_valid, error_msg, vin = validate_and_normalize_vin(vin)
         if not is_valid:
             logger.warning(f'Неверный VIN: {vin}, ошибка: {error_msg}')
             return {'error': error_msg, 'vin': vin}
 
-        try:
-            client = await get_mcp_client()
-            result = await client.maintenance_history(vin)
-            logger.info(f'maintenance_history выполнен для VIN: {vin}')
-            return result
-        except Exception as e:
-            logger.error(f'Ошибка при выполнении maintenance_history: {e}')
-            return {'error': str(e), 'vin': vin}
-
-
-class VehicleRepairsHistoryInput(BaseModel):
-    '''Схема входных данных для инструмента vehicle_repairs_history.'''
-
-    vin: str = Field(description='VIN автомобиля')
+        client = await get_mcp_client()
+        result = await client.maintenance_history(vin)
+        logger.info(f'maintenance_history выполнен для VIN: {vin}')
+        return result
 
 
 class VehicleRepairsHistoryTool(BaseTool):
@@ -191,17 +294,8 @@ class VehicleRepairsHistoryTool(BaseTool):
     '''
 
     name: str = 'vehicle_repairs_history'
-    description: str = '''
-    Получить полную историю всех ремонтов автомобиля в дилерской сети.
-    Используй этот инструмент для:
-    - Комплексного анализа всех ремонтов (гарантийных и платных)
-    - Выявления повторяющихся проблем
-    - Анализа работы дилерских центров
-    - Поиска паттернов неисправностей
-
-    Входные данные: VIN автомобиля
-    '''
-    args_schema: type[BaseModel] = VehicleRepairsHistoryInput
+    description: str = _VEHICLE_REPAIRS_HISTORY_DESC
+    args_schema: type[BaseModel] = VINInput
 
     def _run(
         self,
@@ -211,25 +305,22 @@ class VehicleRepairsHistoryTool(BaseTool):
         '''Синхронная версия - не реализована.'''
         raise NotImplementedError('Используй асинхронную версию (ainvoke)')
 
+    @mcp_safe('vin')
     async def _arun(
         self,
         vin: str,
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> dict[str, Any]:
         '''Асинхронное выполнение инструмента vehicle_repairs_history.'''
-        is_valid, error_msg = validate_vin(vin)
+        is_valid, error_msg, vin = validate_and_normalize_vin(vin)
         if not is_valid:
             logger.warning(f'Неверный VIN: {vin}, ошибка: {error_msg}')
             return {'error': error_msg, 'vin': vin}
 
-        try:
-            client = await get_mcp_client()
-            result = await client.vehicle_repairs_history(vin)
-            logger.info(f'vehicle_repairs_history выполнен для VIN: {vin}')
-            return result
-        except Exception as e:
-            logger.error(f'Ошибка при выполнении vehicle_repairs_history: {e}')
-            return {'error': str(e), 'vin': vin}
+        client = await get_mcp_client()
+        result = await client.vehicle_repairs_history(vin)
+        logger.info(f'vehicle_repairs_history выполнен для VIN: {vin}')
+        return result
 
 
 class ComplianceRAGInput(BaseModel):
@@ -247,17 +338,7 @@ class ComplianceRAGTool(BaseTool):
     '''
 
     name: str = 'compliance_rag'
-    description: str = '''
-    Поиск информации в базе знаний гарантийной политики
-    и стандартов клиентской службы дилера.
-    Используй этот инструмент для:
-    - Интерпретации условий гарантии
-    - Поиска релевантных статей стандартов клиентской службы дилера
-    - Объяснения действий клиентской службы дилера
-    - Получения информации о гарантийных обязательствах
-
-    Входные данные: текстовый запрос на русском языке
-    '''
+    description: str = _COMPLIANCE_RAG_DESC
     args_schema: type[BaseModel] = ComplianceRAGInput
 
     def _run(
@@ -268,6 +349,7 @@ class ComplianceRAGTool(BaseTool):
         '''Синхронная версия - не реализована.'''
         raise NotImplementedError('Используй асинхронную версию (ainvoke)')
 
+    @mcp_safe('query')
     async def _arun(
         self,
         query: str,
@@ -277,16 +359,25 @@ class ComplianceRAGTool(BaseTool):
         if not query or not query.strip():
             return {'error': 'Запрос не может быть пустым'}
 
-        try:
-            client = await get_mcp_client()
-            result = await client.compliance_rag(query)
-            logger.info(
-                f'compliance_rag выполнен для запроса: {query[:50]}...'
-                )
-            return result
-        except Exception as e:
-            logger.error(f'Ошибка при выполнении compliance_rag: {e}')
-            return {'error': str(e), 'query': query}
+        client = await get_mcp_client()
+        result = await client.compliance_rag(query)
+        logger.info(
+            f'compliance_rag выполнен для запроса: {query[:50]}...'
+            )
+        return result
+
+
+@functools.cache
+def _build_tools() -> tuple[BaseTool, ...]:
+    '''Создать экземпляры инструментов один раз при первом обращении.'''
+    return (
+        WarrantyDaysTool(),
+        WarrantyDaysBatchTool(),
+        WarrantyHistoryTool(),
+        MaintenanceHistoryTool(),
+        VehicleRepairsHistoryTool(),
+        ComplianceRAGTool(),
+    )
 
 
 def get_all_tools() -> list[BaseTool]:
@@ -296,13 +387,7 @@ def get_all_tools() -> list[BaseTool]:
     Returns:
         Список экземпляров инструментов
     '''
-    return [
-        WarrantyDaysTool(),
-        WarrantyHistoryTool(),
-        MaintenanceHistoryTool(),
-        VehicleRepairsHistoryTool(),
-        ComplianceRAGTool(),
-    ]
+    return list(_build_tools())
 
 
 def get_tool_by_name(name: str) -> Optional[BaseTool]:
@@ -315,8 +400,7 @@ def get_tool_by_name(name: str) -> Optional[BaseTool]:
     Returns:
         Экземпляр инструмента или None, если инструмент не найден
     '''
-    tools = get_all_tools()
-    for tool in tools:
+    for tool in _build_tools():
         if tool.name == name:
             return tool
     return None
@@ -8,15 +8,125 @@ MCP (Model Context Protocol) клиент для сервиса гарантий
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import random
+import time
+from collections.abc import Awaitable, Callable, Hashable, Sequence
 from contextlib import AsyncExitStack
+from datetime import timedelta
+from operator import attrgetter
 from typing import Any, Optional
-from datetime import datetime, timedelta
 
+import anyio
+import diskcache
+import httpx
+from cachetools import LFUCache, TTLCache
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, INVALID_PARAMS, METHOD_NOT_FOUND
 from loguru import logger
 
 from agent.config import settings, MCPTools
+from agent.tools.cache import ValueAwareTTLCache
+from agent.tools.redis_tier import RedisCache
+
+
+# Пул соединений к MCP серверу: keep-alive между вызовами инструментов
+_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=settings.mcp_max_keepalive_connections,
+    max_connections=settings.mcp_max_connections,
+    keepalive_expiry=settings.mcp_keepalive_expiry,
+)
+
+
+def _create_http_client(
+    headers: Optional[dict[str, str]] = None,
+    timeout: Optional[httpx.Timeout] = None,
+    auth: Optional[httpx.Auth] = None,
+) -> httpx.AsyncClient:
+    '''
+    Фабрика httpx клиента для Streamable HTTP транспорта MCP.
+
+    В отличие от фабрики по умолчанию включает HTTP/2 (мультиплексирование
+    параллельных вызовов в одном соединении при работе через HTTPS),
+    настроенный пул keep-alive соединений и короткий таймаут соединения.
+    '''
+    timeout = timeout or httpx.Timeout(settings.mcp_timeout)
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=httpx.Timeout(
+            connect=settings.mcp_connect_timeout,
+            read=timeout.read,
+            write=timeout.write,
+            pool=timeout.pool,
+        ),
+        auth=auth,
+        follow_redirects=True,
+        http2=settings.mcp_http2,
+        limits=_HTTP_LIMITS,
+    )
+
+
+# Строковые аргументы длиннее порога хранятся в ключе кэша как дайджест
+_KEY_DIGEST_THRESHOLD = 256
+
+# Ключ кэша: (название инструмента, VIN) для VIN-инструментов
+# или (название инструмента, frozenset аргументов) для остальных
+_CacheKey = tuple[str, Hashable]
+
+
+# Извлечение полей ответа call_tool за один вызов
+_extract_result = attrgetter('content', 'structuredContent', 'meta', 'isError')
+
+# Ценность закэшированных ответов при вытеснении (по умолчанию 1.0):
+# полная история ремонтов - самый тяжелый VIN-запрос.
+# compliance_rag хранится в отдельном LFU кэше.
+_TOOL_CACHE_VALUES: dict[str, float] = {
+    MCPTools.VEHICLE_REPAIRS_HISTORY: 2.0,
+}
+
+# Ошибки HTTP транспорт MCP обрабатывает в фоновой задаче, поэтому
+# call_tool никогда не получает httpx исключений. Сессия сообщает о сбое
+# так: McpError с таймаутом чтения (408), закрытым соединением или
+# потерянной на сервере сессией (ответ 404 транспорт передает
+# кодом 32600 без знака); закрытые потоки сессии - исключениями anyio.
+# После любой из этих ошибок сессия пересоздается и вызов повторяется.
+_RETRYABLE_ERROR_CODES = frozenset({
+    httpx.codes.REQUEST_TIMEOUT,
+    CONNECTION_CLOSED,
+    32600,
+})
+_CONNECTION_LOST_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+)
+
+# Верхняя граница задержки между повторными попытками в секундах
+_RETRY_MAX_DELAY = 10.0
+
+# Предельный размер дискового кэша compliance_rag (1 ГБ)
+_DISK_CACHE_SIZE_LIMIT = 2 ** 30
+
+# Закэшированная ошибка: тип исключения и сообщение
+_NegativeEntry = tuple[type[Exception], str]
+
+
+# Инструменты, принимающие VIN (имена совпадают с методами MCPClient)
+VIN_TOOLS: tuple[str, ...] = (
+    MCPTools.WARRANTY_DAYS,
+    MCPTools.WARRANTY_HISTORY,
+    MCPTools.MAINTENANCE_HISTORY,
+    MCPTools.VEHICLE_REPAIRS_HISTORY,
+)
+
+
+def _key_value(value: Any) -> Hashable:
+    '''Значение аргумента для ключа кэша (длинные строки - дайджест).'''
+    if isinstance(value, str) and len(value) > _KEY_DIGEST_THRESHOLD:
+        return hashlib.blake2b(value.encode(), digest_size=16).digest()
+    return value
 
 
 class MCPClientError(Exception):
@@ -43,6 +153,219 @@ class MCPValidationError(MCPClientError):
     pass
 
 
+def _normalize_vin(vin: str) -> str:
+    '''
+    Привести VIN к виду, который MCP сервер использует в путях и ответах.
+
+    Тот же VIN в другом регистре попадает в ту же запись кэша.
+    '''
+    return vin.strip().upper()
+
+
+def _make_vin_tool_method(
+    tool_name: str, summary: str
+) -> Callable[[MCPClient, str], Awaitable[dict[str, Any]]]:
+    '''
+    Создать публичный метод MCPClient для VIN-инструмента.
+
+    Все VIN-инструменты вызываются одинаково: ключ кэша (инструмент, VIN)
+    и единственный аргумент vin, поэтому методы строятся одной фабрикой.
+    '''
+    async def method(self: MCPClient, vin: str) -> dict[str, Any]:
+        vin = _normalize_vin(vin)
+        return await self._cached_call((tool_name, vin), tool_name, vin=vin)
+
+    method.__name__ = tool_name
+    method.__qualname__ = f'MCPClient.{tool_name}'
+    method.__doc__ = (
+        f'{summary}.\n\n'
+        'Args:\n'
+        '    vin: VIN номер автомобиля\n\n'
+        'Returns:\n'
+        '    Словарь с ответом инструмента (result, structured_content, meta)'
+    )
+    return method
+
+
+class _BatchScheduler:
+    '''
+    Объединение близких по времени вызовов инструментов в batch_call.
+
+    Вызовы копятся в течение окна window (или до max_size штук)
+    и отправляются на MCP сервер одним вызовом batch_call. Пачка
+    из одного вызова отправляется обычным вызовом инструмента.
+    '''
+
+    __slots__ = (
+        '_client', '_window', '_max_size', '_queue', '_timer', '_tasks'
+    )
+
+    def __init__(
+        self, client: MCPClient, window: float, max_size: int
+    ) -> None:
+        self._client = client
+        self._window = window
+        self._max_size = max_size
+        self._queue: list[
+            tuple[str, dict[str, Any], asyncio.Future[dict[str, Any]]]
+        ] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(
+        self, tool_name: str, arguments: dict[str, Any]
+    ) -> dict[str, Any]:
+        '''Поставить вызов в очередь и дождаться его результата.'''
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[dict[str, Any]] = loop.create_future()
+        self._queue.append((tool_name, arguments, future))
+        if len(self._queue) >= self._max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        '''Отправить накопленную пачку в фоновой задаче.'''
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(
+        self,
+        batch: list[
+            tuple[str, dict[str, Any], asyncio.Future[dict[str, Any]]]
+        ],
+    ) -> None:
+        '''Выполнить пачку и раздать результаты ожидающим вызовам.'''
+        if len(batch) == 1:
+            tool_name, arguments, future = batch[0]
+            try:
+                result = await self._client._call_tool(tool_name, **arguments)
+            except Exception as e:
+                _resolve(future, exception=e)
+            else:
+                _resolve(future, result=result)
+            return
+
+        try:
+            response = await self._client._call_tool(
+                MCPTools.BATCH_CALL,
+                calls=[
+                    {'tool': tool_name, 'arguments': arguments}
+                    for tool_name, arguments, _ in batch
+                ],
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                _resolve(future, exception=e)
+            return
+
+        items = (response.get('structured_content') or {}).get('results', [])
+        for index, (tool_name, _, future) in enumerate(batch):
+            item = items[index] if index < len(items) else None
+            if item is None:
+                error = MCPClientError(
+                    f'Нет результата {tool_name} в ответе batch_call'
+                )
+                _resolve(future, exception=error)
+            elif 'error' in item:
+                # Исключение инструмента: без batch_call MCP сервер
+                # возвращает его текст с isError
+                _resolve(
+                    future,
+                    result=_build_response(
+                        tool_name, item['error'], None, None, True
+                    ),
+                )
+            else:
+                _resolve(
+                    future,
+                    result=_build_response(
+                        tool_name,
+                        item.get('text', ''),
+                        item.get('structured_content'),
+                        item.get('meta'),
+                        item.get('is_error', False),
+                    ),
+                )
+
+
+def _is_retryable(error: Exception) -> bool:
+    '''Можно ли повторить вызов на новой сессии после этой ошибки.'''
+    if isinstance(error, (MCPConnectionError, *_CONNECTION_LOST_ERRORS)):
+        return True
+    return (
+        isinstance(error, McpError)
+        and error.error.code in _RETRYABLE_ERROR_CODES
+    )
+
+
+def _reraise_fatal(results: Sequence[Any]) -> None:
+    '''
+    Пробросить отмену и другие не-Exception исключения из gather.
+
+    gather(return_exceptions=True) возвращает CancelledError,
+    KeyboardInterrupt и SystemExit наравне с обычными ошибками;
+    они не должны превращаться в ответ с ключом error.
+    '''
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(
+            result, Exception
+        ):
+            raise result
+
+
+def _build_response(
+    tool_name: str,
+    text: str,
+    structured_content: Optional[Any],
+    meta: Optional[dict[str, Any]],
+    is_error: bool,
+) -> dict[str, Any]:
+    '''
+    Ответ инструмента в формате MCPClient.
+
+    Общий для обычного вызова и batch_call, чтобы включение пакетной
+    отправки не меняло ответы. Ответ с meta.error_type (ошибка backend
+    API на стороне сервера) тоже считается ошибкой.
+
+    Returns:
+        Словарь с ключами result, structured_content и meta (если
+        есть) и is_error (только при ошибке)
+    '''
+    response: dict[str, Any] = {'result': text}  # Обратная совместимость
+    if structured_content is not None:
+        response['structured_content'] = structured_content
+    if meta is not None:
+        response['meta'] = meta
+    if is_error or (isinstance(meta, dict) and 'error_type' in meta):
+        response['is_error'] = True
+        logger.warning(
+            'MCP инструмент {} вернул ошибку: {}', tool_name, text
+        )
+    return response
+
+
+def _resolve(
+    future: asyncio.Future[dict[str, Any]],
+    result: Optional[dict[str, Any]] = None,
+    exception: Optional[Exception] = None,
+) -> None:
+    '''Завершить future, если ожидающий вызов еще не отменен.'''
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
 class MCPClient:
     '''
     Клиент для взаимодействия с MCP сервером.
@@ -54,6 +377,26 @@ class MCPClient:
     - Опциональное кэширование ответов
     '''
 
+    __slots__ = (
+        'base_url',
+        'timeout',
+        'max_retries',
+        'enable_cache',
+        'auth_token',
+        '_cache',
+        '_rag_cache',
+        '_neg_cache',
+        '_disk_cache',
+        '_pending',
+        '_runner',
+        '_closing',
+        '_connect_lock',
+        '_session',
+        '_semaphore',
+        '_batcher',
+        '_redis',
+    )
+
     def __init__(
         self,
         base_url: Optional[str] = None,
@@ -80,13 +423,58 @@ class MCPClient:
         self.enable_cache = enable_cache
         self.auth_token = auth_token or settings.mcp_auth_token
 
-        # Simple in-memory cache
-        self._cache: dict[str, tuple[Any, datetime]] = {}
-        self._cache_ttl = timedelta(seconds=settings.mcp_cache_ttl)
+        # Bounded in-memory cache with TTL expiry and value-aware eviction
+        self._cache = ValueAwareTTLCache(
+            maxsize=settings.mcp_cache_max,
+            ttl=settings.mcp_cache_ttl,
+            tool_values=_TOOL_CACHE_VALUES,
+            timer=time.monotonic,
+        )
+        # compliance_rag: a few popular queries dominate, so LFU eviction
+        # keeps them while one-off queries are evicted; entries hold expiry
+        self._rag_cache: LFUCache[_CacheKey, tuple[Any, float]] = LFUCache(
+            maxsize=settings.mcp_rag_cache_max,
+        )
+        # Short-lived cache of terminal errors (unknown tool, invalid input)
+        self._neg_cache: TTLCache[_CacheKey, _NegativeEntry] = TTLCache(
+            maxsize=settings.mcp_cache_max,
+            ttl=settings.mcp_negative_cache_ttl,
+            timer=time.monotonic,
+        )
+        # Persistent L2 cache for compliance_rag (survives restarts)
+        self._disk_cache: Optional[diskcache.Cache] = None
+        if enable_cache and settings.mcp_disk_cache_dir:
+            self._disk_cache = diskcache.Cache(
+                settings.mcp_disk_cache_dir,
+                size_limit=_DISK_CACHE_SIZE_LIMIT,
+            )
+        # Shared L2 cache in Redis (cross-process, survives restarts)
+        self._redis: Optional[RedisCache] = None
+        if enable_cache and settings.mcp_redis_url:
+            self._redis = RedisCache(
+                settings.mcp_redis_url,
+                ttl=settings.mcp_cache_ttl,
+            )
+        # In-flight tool calls shared by concurrent identical requests
+        self._pending: dict[_CacheKey, asyncio.Task[dict[str, Any]]] = {}
 
         # MCP HTTP client
-        self._stack: Optional[AsyncExitStack] = None
+        self._runner: Optional[asyncio.Task[None]] = None
+        self._closing: Optional[asyncio.Event] = None
         self._session: Optional[ClientSession] = None
+        self._connect_lock = asyncio.Lock()
+
+        # Limit of simultaneous tool calls to the MCP server
+        self._semaphore = asyncio.Semaphore(settings.mcp_max_concurrency)
+
+        # Optional coalescing of concurrent tool calls into batch_call
+        self._batcher: Optional[_BatchScheduler] = None
+        if settings.mcp_enable_batching:
+            self._batcher = _BatchScheduler(
+                self,
+                window=settings.mcp_batch_window_ms / 1000,
+                max_size=settings.mcp_batch_max_size,
+            )
 
         logger.info(f'MCP клиент инициализирован с base_url={self.base_url}')
 
@@ -106,8 +494,12 @@ class MCPClient:
 
     async def connect(self) -> None:
         '''Установление соединения с MCP сервером.'''
-        if self._session is None:
-            stack = AsyncExitStack()
+        if self._session is not None:
+            return
+        async with self._connect_lock:
+            # Повторная проверка: сессию мог открыть другой task
+            if self._session is not None:
+                return
             # Build URL with /mcp endpoint for Streamable HTTP transport
             url = f'{self.base_url}/mcp'
 
@@ -119,77 +511,184 @@ class MCPClient:
                     'MCP клиент использует Bearer token аутентификацию'
                     )
 
-            # Open Streamable HTTP streams
-            read_stream, write_stream, _ = (
-                await stack.enter_async_context(
-                    streamablehttp_client(
-                        url=url,
-                        timeout=self.timeout,
-                        headers=headers,
-                    )
-                )
+            ready: asyncio.Future[ClientSession] = (
+                asyncio.get_running_loop().create_future()
             )
-            # Open MCP session
-            session = (
-                await stack.enter_async_context(
-                    ClientSession(read_stream, write_stream)
-                )
+            closing = asyncio.Event()
+            runner = asyncio.create_task(
+                self._run_session(url, headers, ready, closing)
             )
-            await session.initialize()
-            self._stack = stack
+            try:
+                session = await asyncio.shield(ready)
+            except BaseException:
+                # Сессия, открытая после отмены connect, сразу закроется
+                closing.set()
+                raise
+            self._runner = runner
+            self._closing = closing
             self._session = session
             logger.debug('MCP HTTP клиент создан и инициализирован')
 
+    async def _run_session(
+        self,
+        url: str,
+        headers: Optional[dict[str, str]],
+        ready: asyncio.Future[ClientSession],
+        closing: asyncio.Event,
+    ) -> None:
+        '''
+        Держать транспорт и сессию MCP открытыми до закрытия.
+
+        Транспорт открывается и закрывается в отдельной задаче: anyio
+        требует выхода из cancel scope в той же задаче, а при сетевой
+        ошибке транспорт отменяет задачу-владельца. Так отмена достается
+        этой задаче, а не вызывающему коду (например, lifespan API);
+        ожидающие вызовы получают ошибку закрытой сессии и повторяются.
+        '''
+        session: Optional[ClientSession] = None
+        try:
+            async with AsyncExitStack() as stack:
+                session = await self._open_session(stack, url, headers)
+                ready.set_result(session)
+                await closing.wait()
+        except Exception as e:
+            if ready.done():
+                logger.warning('Соединение с MCP сервером прервано: {!r}', e)
+            else:
+                error = MCPConnectionError(
+                    f'Не удалось подключиться к MCP серверу '
+                    f'{self.base_url}: {e!r}'
+                )
+                error.__cause__ = e
+                ready.set_exception(error)
+        finally:
+            if not ready.done():
+                ready.cancel()
+            if session is not None and self._session is session:
+                self._session = None
+
+    async def _open_session(
+        self,
+        stack: AsyncExitStack,
+        url: str,
+        headers: Optional[dict[str, str]],
+    ) -> ClientSession:
+        '''Открыть Streamable HTTP потоки и инициализировать MCP сессию.'''
+        read_stream, write_stream, _ = await stack.enter_async_context(
+            streamablehttp_client(
+                url=url,
+                timeout=self.timeout,
+                headers=headers,
+                httpx_client_factory=_create_http_client,
+            )
+        )
+        # Без таймаута чтения вызов на упавшем сервере ждет ответа
+        # бесконечно; по таймауту сессия поднимает McpError (408)
+        session = await stack.enter_async_context(
+            ClientSession(
+                read_stream,
+                write_stream,
+                read_timeout_seconds=timedelta(seconds=self.timeout),
+            )
+        )
+        await session.initialize()
+        return session
+
+    async def _ensure_connected(self) -> ClientSession:
+        '''Подключиться к MCP серверу при необходимости и вернуть сессию.'''
+        await self.connect()
+        assert self._session is not None
+        return self._session
+
     async def close(self) -> None:
         '''Закрытие соединения с MCP сервером.'''
-        if self._stack is not None:
-            try:
-                await self._stack.aclose()
-            except (asyncio.CancelledError, GeneratorExit):
-                pass
-            except RuntimeError as e:
-                if (
-                    'exit cancel scope in a different task'
-                    not in str(e).lower()
-                ):
-                    raise
-            finally:
-                self._stack = None
-                self._session = None
-                logger.debug('MCP HTTP клиент закрыт')
+        if self._redis is not None:
+            await self._redis.close()
+        if self._runner is not None:
+            await self._stop_runner()
+            logger.debug('MCP HTTP клиент закрыт')
 
-    def _get_cache_key(self, tool_name: str, **kwargs: Any) -> str:
-        '''Генерация ключа кэша из названия инструмента и аргументов.'''
-        # Simple cache key: tool_name + sorted args
-        args_str = '_'.join(f'{k}={v}' for k, v in sorted(kwargs.items()))
-        return f'{tool_name}:{args_str}'
+    async def _reset_session(self, session: ClientSession) -> None:
+        '''
+        Закрыть сессию после потери соединения.
+
+        Закрывается только переданная сессия: если другой вызов уже
+        переподключился, новая сессия не трогается. Следующий вызов
+        откроет новую сессию через _ensure_connected.
+        '''
+        if self._session is session:
+            await self._stop_runner()
+
+    async def _stop_runner(self) -> None:
+        '''Остановить задачу текущей сессии и дождаться закрытия.'''
+        runner, closing = self._runner, self._closing
+        self._runner = self._closing = self._session = None
+        if closing is not None:
+            closing.set()
+        if runner is not None:
+            await runner
+
+    def _get_cache_key(self, tool_name: str, **kwargs: Any) -> _CacheKey:
+        '''
+        Генерация ключа кэша из названия инструмента и аргументов.
+
+        Ключ - кортеж с frozenset аргументов: не требует сортировки
+        и форматирования строки. Для инструментов с одним аргументом
+        (vin, query) ключ - (название, значение), как у VIN-инструментов.
+        Длинные строки (например, query для compliance_rag) заменяются
+        16-байтовым blake2b дайджестом.
+        '''
+        if len(kwargs) == 1:
+            (value,) = kwargs.values()
+            return (tool_name, _key_value(value))
+        return (
+            tool_name,
+            frozenset((k, _key_value(v)) for k, v in kwargs.items()),
+        )
 
-    def _get_from_cache(self, cache_key: str) -> Optional[Any]:
+    def _get_from_cache(self, cache_key: _CacheKey) -> Optional[Any]:
         '''Получение значения из кэша, если оно не истекло.'''
         if not self.enable_cache:
             return None
 
-        if cache_key in self._cache:
-            value, timestamp = self._cache[cache_key]
-            if datetime.now() - timestamp < self._cache_ttl:
-                logger.debug(f'Кэш hit для ключа: {cache_key}')
-                return value
-            else:
-                # Expired, remove from cache
-                del self._cache[cache_key]
-                logger.debug(f'Кэш истек для ключа: {cache_key}')
+        if cache_key[0] == MCPTools.COMPLIANCE_RAG:
+            value = self._get_from_rag_cache(cache_key)
+        else:
+            value = self._cache.get(cache_key)
+        if value is not None:
+            logger.debug('Кэш hit для ключа: {}', cache_key)
+        return value
+
+    def _get_from_rag_cache(self, cache_key: _CacheKey) -> Optional[Any]:
+        '''Получение ответа compliance_rag из LFU кэша с проверкой TTL.'''
+        entry = self._rag_cache.get(cache_key)
+        if entry is None:
+            return None
 
-        return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._rag_cache.pop(cache_key, None)
+            return None
+        return value
 
-    def _put_to_cache(self, cache_key: str, value: Any) -> None:
-        '''Добавление значения в кэш с текущей временной меткой.'''
+    def _put_to_cache(self, cache_key: _CacheKey, value: Any) -> None:
+        '''Добавление значения в кэш (истекает через mcp_cache_ttl).'''
         if self.enable_cache:
-            self._cache[cache_key] = (value, datetime.now())
-            logger.debug(f'Значение добавлено в кэш для ключа: {cache_key}')
+            if cache_key[0] == MCPTools.COMPLIANCE_RAG:
+                self._rag_cache[cache_key] = (
+                    value, time.monotonic() + settings.mcp_cache_ttl
+                )
+            else:
+                self._cache[cache_key] = value
+            logger.debug('Значение добавлено в кэш для ключа: {}', cache_key)
 
     def clear_cache(self) -> None:
         '''Очистка всех кэшированных ответов.'''
         self._cache.clear()
+        self._rag_cache.clear()
+        self._neg_cache.clear()
+        if self._disk_cache is not None:
+            self._disk_cache.clear()
         logger.info('Кэш очищен')
 
     async def _call_tool(
@@ -212,181 +711,496 @@ class MCPClient:
         Raises:
             MCPConnectionError: Если соединение не установлено
             MCPToolNotFoundError: Если инструмент не найден
+            MCPValidationError: Если сервер отклонил аргументы
             MCPClientError: При других ошибках
         '''
-        if self._session is None:
-            await self.connect()
-
-        assert self._session is not None
-
         try:
             logger.debug(
-                f'Вызов MCP инструмента: {tool_name} с аргументами: '
-                f'{kwargs}'
+                'Вызов MCP инструмента: {} с аргументами: {}',
+                tool_name,
+                kwargs,
             )
 
             # Вызываем инструмент через MCP session
-            result = await self._session.call_tool(
-                name=tool_name,
-                arguments=kwargs
-            )
+            result = await self._call_with_retry(tool_name, kwargs)
 
             # Извлекаем текстовое содержимое из ответа
-            blocks = getattr(result, 'content', [])
-            texts: list[str] = []
-            for block in blocks:
-                text = getattr(block, 'text', None)
-                if text:
-                    texts.append(text)
-
-            response_text = '\n'.join(texts).strip()
-
-            # Извлекаем структурированные данные (если есть)
-            structured_content = getattr(result, 'structured_content', None)
-
-            # Извлекаем метаданные (если есть)
-            meta = getattr(result, '_meta', None)
-
-            # Проверяем флаг ошибки
-            is_error = getattr(result, 'isError', False)
+            # Поля CallToolResult: content, structuredContent, meta, isError
+            try:
+                blocks, structured_content, meta, is_error = (
+                    _extract_result(result)
+                )
+            except AttributeError:
+                # Старые версии схемы без structuredContent/meta
+                blocks = getattr(result, 'content', [])
+                structured_content = getattr(result, 'structuredContent', None)
+                meta = getattr(result, 'meta', None)
+                is_error = getattr(result, 'isError', False)
+
+            response_text = '\n'.join(
+                text
+                for text in (getattr(block, 'text', None) for block in blocks)
+                if text
+            ).strip()
 
             logger.debug(
-                f'MCP инструмент {tool_name} ответил '
-                f'(is_error={is_error}, '
-                f'has_structured={structured_content is not None})'
+                'MCP инструмент {} ответил (is_error={}, has_structured={})',
+                tool_name,
+                is_error,
+                structured_content is not None,
             )
 
-            # Формируем расширенный ответ
-            response = {
-                'result': response_text,  # Обратная совместимость
-            }
-
-            # Добавляем дополнительные поля если они есть
-            if structured_content is not None:
-                response['structured_content'] = structured_content
-
-            if meta is not None:
-                response['meta'] = meta
-
-            if is_error:
-                response['is_error'] = is_error
-                logger.warning(
-                    f'MCP инструмент {tool_name} вернул ошибку: '
-                    f'{response_text}'
-                )
-
-            return response
+            return _build_response(
+                tool_name, response_text, structured_content, meta, is_error
+            )
 
+        except MCPConnectionError:
+            raise
         except Exception as e:
-            error_msg = str(e).lower()
-            if 'not found' in error_msg or 'unknown tool' in error_msg:
+            # Ошибка классифицируется по коду JSON-RPC, а не по тексту:
+            # MCPToolNotFoundError и MCPValidationError кэшируются
+            error_code = e.error.code if isinstance(e, McpError) else None
+            if (
+                error_code == METHOD_NOT_FOUND
+                or tool_name not in MCPTools.all_tools()
+            ):
                 raise MCPToolNotFoundError(
                     f'Инструмент не найден: {tool_name}'
                 ) from e
+            elif error_code == INVALID_PARAMS:
+                raise MCPValidationError(
+                    f'Некорректные аргументы инструмента {tool_name}: {e}'
+                ) from e
             else:
                 raise MCPClientError(
                     f'Ошибка при вызове инструмента {tool_name}: {e}'
                 ) from e
 
-    async def warranty_days(self, vin: str) -> dict[str, Any]:
+    async def _call_with_retry(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+    ) -> Any:
         '''
-        Получить статистику дней в ремонте по годам владения автомобиля.
+        Вызов инструмента с повторными попытками при сбоях соединения.
 
-        Args:
-            vin: VIN номер автомобиля
+        Повторяются только ошибки подключения, таймауты чтения и потеря
+        сессии (см. _RETRYABLE_ERROR_CODES): перед повтором сессия
+        закрывается и открывается заново. Задержка выбирается случайно
+        из [0, min(10, 2^attempt)] секунд (full jitter), чтобы
+        параллельные вызовы не повторялись синхронно.
 
-        Returns:
-            Словарь с статистикой дней в ремонте по годам владения автомобиля
+        Raises:
+            MCPConnectionError: Если все попытки завершились сбоем
+        '''
+        for attempt in range(self.max_retries):
+            session: Optional[ClientSession] = None
+            try:
+                session = self._session or await self._ensure_connected()
+                async with self._semaphore:
+                    return await session.call_tool(
+                        name=tool_name,
+                        arguments=arguments
+                    )
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                if session is not None:
+                    await self._reset_session(session)
+                if attempt == self.max_retries - 1:
+                    raise MCPConnectionError(
+                        f'MCP сервер недоступен при вызове {tool_name}: '
+                        f'{e!r}'
+                    ) from e
+                delay = random.uniform(0, min(_RETRY_MAX_DELAY, 2 ** attempt))
+                logger.warning(
+                    f'Сбой соединения при вызове {tool_name} '
+                    f'(попытка {attempt + 1}/{self.max_retries}): {e!r}; '
+                    f'повтор через {delay:.2f} с'
+                )
+                await asyncio.sleep(delay)
+
+        raise MCPConnectionError(f'Не удалось вызвать {tool_name}')
+
+    async def _cached_call(
+        self, cache_key: _CacheKey, tool_name: str, **kwargs: Any
+    ) -> dict[str, Any]:
+        '''
+        Вызов инструмента с кэшированием и объединением одинаковых запросов.
+
+        Если такой же вызов уже выполняется, результат ожидается у него,
+        и на MCP сервер уходит только один запрос. Запрос выполняется
+        в общей задаче: отмена любого из ожидающих, в том числе первого,
+        не прерывает его для остальных.
         '''
-        cache_key = self._get_cache_key(MCPTools.WARRANTY_DAYS, vin=vin)
         cached = self._get_from_cache(cache_key)
         if cached is not None:
             return cached
 
-        result = await self._call_tool(MCPTools.WARRANTY_DAYS, vin=vin)
-        self._put_to_cache(cache_key, result)
+        negative = self._neg_cache.get(cache_key)
+        if negative is not None:
+            exc_type, message = negative
+            logger.debug('Кэш ошибки для ключа: {}', cache_key)
+            raise exc_type(message)
+
+        task = self._pending.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                self._fetch_and_store(cache_key, tool_name, kwargs)
+            )
+            self._pending[cache_key] = task
+            task.add_done_callback(
+                lambda done: self._finish_pending(cache_key, done)
+            )
+        else:
+            logger.debug('Ожидание выполняющегося запроса: {}', cache_key)
+        # shield: отмена ожидающего не должна отменять общий запрос
+        return await asyncio.shield(task)
+
+    def _finish_pending(
+        self, cache_key: _CacheKey, task: asyncio.Task[dict[str, Any]]
+    ) -> None:
+        '''Снять завершенный запрос из списка выполняющихся.'''
+        if self._pending.get(cache_key) is task:
+            del self._pending[cache_key]
+        # Помечаем исключение полученным, если ожидающих не осталось
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch_and_store(
+        self, cache_key: _CacheKey, tool_name: str, kwargs: dict[str, Any]
+    ) -> dict[str, Any]:
+        '''Общий запрос _cached_call: вызов инструмента и запись в кэш.'''
+        try:
+            result = await self._fetch(cache_key, tool_name, kwargs)
+        except (MCPToolNotFoundError, MCPValidationError) as e:
+            if self.enable_cache:
+                # Повтор не поможет - ошибку не отправляем на сервер до TTL
+                self._neg_cache[cache_key] = (type(e), str(e))
+            raise
+        # Ошибка инструмента может быть временной - ее не кэшируем
+        if not result.get('is_error'):
+            self._put_to_cache(cache_key, result)
+        return result
+
+    async def _fetch(
+        self, cache_key: _CacheKey, tool_name: str, kwargs: dict[str, Any]
+    ) -> dict[str, Any]:
+        '''Получение ответа из L2 кэша Redis или от MCP сервера.'''
+        redis = self._redis
+        redis_key = None
+        if redis is not None:
+            redis_key = RedisCache.make_key(*cache_key)
+            if redis_key is not None:
+                cached = await redis.get(redis_key)
+                if cached is not None:
+                    return cached
+
+        if self._batcher is not None:
+            result = await self._batcher.submit(tool_name, kwargs)
+        else:
+            result = await self._call_tool(tool_name, **kwargs)
+
+        if (
+            redis is not None
+            and redis_key is not None
+            and not result.get('is_error')
+        ):
+            await redis.set(redis_key, result)
         return result
 
-    async def warranty_history(self, vin: str) -> dict[str, Any]:
+    warranty_days = _make_vin_tool_method(
+        MCPTools.WARRANTY_DAYS,
+        'Получить статистику дней в ремонте по годам владения автомобиля',
+    )
+
+    async def warranty_days_batch(
+        self, vins: list[str]
+    ) -> dict[str, dict[str, Any] | Exception]:
         '''
-        Получить историю гарантийных обращений автомобиля.
+        Получить статистику дней в ремонте для нескольких автомобилей.
+
+        VIN из кэша L1, закэшированные ошибки и выполняющиеся запросы
+        warranty_days переиспользуются; остальные запрашиваются
+        инструментом warranty_days_batch пачками по mcp_batch_max_size
+        VIN (сначала из Redis). Запросы этих VIN регистрируются как
+        выполняющиеся, поэтому параллельный warranty_days(vin) ожидает
+        пачку, а не отправляет свой запрос. Сбой одной пачки не влияет
+        на остальные.
 
         Args:
-            vin: VIN номер автомобиля
+            vins: Список VIN номеров автомобилей
 
         Returns:
-            Словарь с историей гарантийных обращений автомобиля
+            Словарь VIN (как переданы) -> то, что вернул бы
+            warranty_days(vin): ответ или исключение, которое он бы поднял
         '''
-        cache_key = self._get_cache_key(MCPTools.WARRANTY_HISTORY, vin=vin)
-        cached = self._get_from_cache(cache_key)
-        if cached is not None:
-            return cached
+        tool_name = MCPTools.WARRANTY_DAYS
+        unique_vins = list(dict.fromkeys(map(_normalize_vin, vins)))
+        results: dict[str, dict[str, Any] | Exception] = {}
+        tasks: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        missing: list[str] = []
+        for vin in unique_vins:
+            cache_key = (tool_name, vin)
+            cached = self._get_from_cache(cache_key)
+            if cached is not None:
+                results[vin] = cached
+                continue
+            negative = self._neg_cache.get(cache_key)
+            if negative is not None:
+                exc_type, message = negative
+                results[vin] = exc_type(message)
+                continue
+            task = self._pending.get(cache_key)
+            if task is None:
+                missing.append(vin)
+            else:
+                tasks[vin] = task
 
-        result = await self._call_tool(MCPTools.WARRANTY_HISTORY, vin=vin)
-        self._put_to_cache(cache_key, result)
+        size = settings.mcp_batch_max_size
+        for i in range(0, len(missing), size):
+            chunk = asyncio.create_task(
+                self._fetch_warranty_days_batch(missing[i:i + size])
+            )
+            for vin in missing[i:i + size]:
+                cache_key = (tool_name, vin)
+                task = asyncio.create_task(self._take_batch_item(chunk, vin))
+                self._pending[cache_key] = task
+                task.add_done_callback(
+                    lambda done, key=cache_key: self._finish_pending(
+                        key, done
+                    )
+                )
+                tasks[vin] = task
+
+        # shield: как в _cached_call, отмена не прерывает запросы
+        outcomes = await asyncio.gather(
+            *(asyncio.shield(task) for task in tasks.values()),
+            return_exceptions=True,
+        )
+        for vin, outcome in zip(tasks, outcomes):
+            # Отмена (BaseException) не становится ответом по VIN
+            if not isinstance(outcome, (dict, Exception)):
+                raise outcome
+            results[vin] = outcome
+
+        return {vin: results[_normalize_vin(vin)] for vin in vins}
+
+    @staticmethod
+    async def _take_batch_item(
+        chunk: asyncio.Task[dict[str, dict[str, Any] | MCPClientError]],
+        vin: str,
+    ) -> dict[str, Any]:
+        '''Ответ warranty_days для одного VIN из общего запроса пачки.'''
+        result = (await asyncio.shield(chunk))[vin]
+        if isinstance(result, MCPClientError):
+            raise result
         return result
 
-    async def maintenance_history(self, vin: str) -> dict[str, Any]:
+    async def _fetch_warranty_days_batch(
+        self, vins: list[str]
+    ) -> dict[str, dict[str, Any] | MCPClientError]:
+        '''
+        Ответы warranty_days для пачки VIN: из Redis, остальные одним
+        вызовом warranty_days_batch с записью успешных ответов в кэш.
+        '''
+        tool_name = MCPTools.WARRANTY_DAYS
+        results: dict[str, dict[str, Any] | MCPClientError] = {}
+        if self._redis is not None:
+            found = await self._redis.get_many(
+                [RedisCache.vin_key(tool_name, vin) for vin in vins]
+            )
+            for vin, cached in zip(vins, found):
+                if cached is not None:
+                    self._put_to_cache((tool_name, vin), cached)
+                    results[vin] = cached
+        vins = [vin for vin in vins if vin not in results]
+        if not vins:
+            return results
+
+        response = await self._call_tool(
+            MCPTools.WARRANTY_DAYS_BATCH, vins=vins
+        )
+        items = (response.get('structured_content') or {}).get('results', {})
+
+        to_store: dict[str, dict[str, Any]] = {}
+        for vin in vins:
+            item = items.get(vin)
+            if item is None:
+                # Пакет отклонен целиком (текст ответа - причина)
+                # или сервер не вернул этот VIN
+                results[vin] = MCPClientError(
+                    response.get('result')
+                    or 'VIN отсутствует в ответе warranty_days_batch'
+                )
+                continue
+
+            result = _build_response(
+                tool_name,
+                item.get('text', ''),
+                item.get('structured_content'),
+                item.get('meta'),
+                item.get('is_error', False),
+            )
+            results[vin] = result
+            if not result.get('is_error'):
+                self._put_to_cache((tool_name, vin), result)
+                to_store[RedisCache.vin_key(tool_name, vin)] = result
+
+        if to_store and self._redis is not None:
+            await self._redis.set_many(to_store)
+        return results
+
+    warranty_history = _make_vin_tool_method(
+        MCPTools.WARRANTY_HISTORY,
+        'Получить историю гарантийных обращений автомобиля',
+    )
+
+    maintenance_history = _make_vin_tool_method(
+        MCPTools.MAINTENANCE_HISTORY,
+        'Получить историю технического обслуживания автомобиля',
+    )
+
+    vehicle_repairs_history = _make_vin_tool_method(
+        MCPTools.VEHICLE_REPAIRS_HISTORY,
+        'Получить полную историю всех ремонтов автомобиля в дилерской сети',
+    )
+
+    async def compliance_rag(self, query: str) -> dict[str, Any]:
         '''
-        Получить историю технического обслуживания автомобиля.
+        Поиск информации в базе знаний гарантийной политики и законодательства.
+
+        Если задан MCP_DISK_CACHE_DIR, ответы дополнительно сохраняются
+        в дисковый кэш и переживают перезапуск агента.
 
         Args:
-            vin: VIN номер автомобиля
+            query: Запрос для поиска в базе знаний гарантийной политики
 
         Returns:
-            Словарь с историей технического обслуживания автомобиля
+            Словарь с релевантной информацией
+            о гарантийной политике и законодательстве
         '''
-        cache_key = self._get_cache_key(MCPTools.MAINTENANCE_HISTORY, vin=vin)
+        cache_key = self._get_cache_key(MCPTools.COMPLIANCE_RAG, query=query)
+        if self._disk_cache is None:
+            return await self._cached_call(
+                cache_key, MCPTools.COMPLIANCE_RAG, query=query
+            )
+
         cached = self._get_from_cache(cache_key)
         if cached is not None:
             return cached
 
-        result = await self._call_tool(MCPTools.MAINTENANCE_HISTORY, vin=vin)
-        self._put_to_cache(cache_key, result)
+        disk_key = (
+            f'{MCPTools.COMPLIANCE_RAG}:'
+            f'{hashlib.blake2b(query.encode(), digest_size=16).hexdigest()}'
+        )
+        cached = await asyncio.to_thread(self._disk_cache.get, disk_key)
+        if cached is not None:
+            logger.debug('Дисковый кэш hit для ключа: {}', disk_key)
+            self._put_to_cache(cache_key, cached)
+            return cached
+
+        result = await self._cached_call(
+            cache_key, MCPTools.COMPLIANCE_RAG, query=query
+        )
+        if not result.get('is_error'):
+            await asyncio.to_thread(
+                self._disk_cache.set,
+                disk_key,
+                result,
+                expire=settings.mcp_rag_disk_ttl,
+            )
         return result
 
-    async def vehicle_repairs_history(self, vin: str) -> dict[str, Any]:
+    async def fetch_all(
+        self,
+        vin: str,
+        tools: Optional[Sequence[str]] = None,
+    ) -> dict[str, dict[str, Any]]:
         '''
-        Получить полную историю всех ремонтов автомобиля в дилерской сети.
+        Параллельно вызвать несколько VIN-инструментов для одного автомобиля.
+
+        Вызовы выполняются через asyncio.gather, поэтому общее время
+        равно самому долгому вызову, а не их сумме. Ошибка одного
+        инструмента не отменяет остальные.
 
         Args:
             vin: VIN номер автомобиля
+            tools: Названия инструментов (по умолчанию все VIN_TOOLS)
 
         Returns:
-            Словарь с полной историей всех ремонтов автомобиля в дилерской сети
+            Словарь название инструмента -> ответ; при исключении
+            ответ содержит ключ error
         '''
-        cache_key = self._get_cache_key(
-            MCPTools.VEHICLE_REPAIRS_HISTORY, vin=vin
-        )
-        cached = self._get_from_cache(cache_key)
-        if cached is not None:
-            return cached
+        tool_names = tuple(tools) if tools is not None else VIN_TOOLS
+        unknown = set(tool_names).difference(VIN_TOOLS)
+        if unknown:
+            raise MCPToolNotFoundError(
+                f'Инструменты не принимают VIN: {", ".join(sorted(unknown))}'
+            )
 
-        result = await self._call_tool(
-            MCPTools.VEHICLE_REPAIRS_HISTORY, vin=vin
+        results = await asyncio.gather(
+            *(getattr(self, name)(vin) for name in tool_names),
+            return_exceptions=True,
         )
-        self._put_to_cache(cache_key, result)
-        return result
+        _reraise_fatal(results)
 
-    async def compliance_rag(self, query: str) -> dict[str, Any]:
+        responses: dict[str, dict[str, Any]] = {}
+        for name, result in zip(tool_names, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    f'Ошибка при вызове {name} для VIN {vin}: {result}'
+                )
+                responses[name] = {'error': str(result)}
+            else:
+                responses[name] = result
+        return responses
+
+    async def prewarm(
+        self,
+        vins: Sequence[str],
+        tools: Sequence[str] = (
+            MCPTools.WARRANTY_HISTORY,
+            MCPTools.WARRANTY_DAYS,
+        ),
+    ) -> int:
         '''
-        Поиск информации в базе знаний гарантийной политики и законодательства.
+        Заранее заполнить кэш ответами инструментов для списка VIN.
+
+        Все вызовы выполняются параллельно; ошибки отдельных вызовов
+        логируются и не прерывают прогрев.
 
         Args:
-            query: Запрос для поиска в базе знаний гарантийной политики
+            vins: VIN номера автомобилей
+            tools: Названия VIN-инструментов для прогрева
 
         Returns:
-            Словарь с релевантной информацией
-            о гарантийной политике и законодательстве
+            Количество успешно закэшированных ответов
         '''
-        cache_key = self._get_cache_key(MCPTools.COMPLIANCE_RAG, query=query)
-        cached = self._get_from_cache(cache_key)
-        if cached is not None:
-            return cached
+        unknown = set(tools).difference(VIN_TOOLS)
+        if unknown:
+            raise MCPToolNotFoundError(
+                f'Инструменты не принимают VIN: {", ".join(sorted(unknown))}'
+            )
 
-        result = await self._call_tool(MCPTools.COMPLIANCE_RAG, query=query)
-        self._put_to_cache(cache_key, result)
-        return result
+        calls = [(name, vin) for vin in dict.fromkeys(vins) for name in tools]
+        results = await asyncio.gather(
+            *(getattr(self, name)(vin) for name, vin in calls),
+            return_exceptions=True,
+        )
+        _reraise_fatal(results)
+
+        warmed = 0
+        for (name, vin), result in zip(calls, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    f'Прогрев кэша {name} для VIN {vin} не удался: {result}'
+                )
+            else:
+                warmed += 1
+
+        logger.info(f'Кэш MCP прогрет: {warmed}/{len(calls)} ответов')
+        return warmed
 
     async def health_check(self) -> dict[str, Any]:
         '''
@@ -398,14 +1212,11 @@ class MCPClient:
         logger.info(f'Health check для MCP сервера: {self.base_url}')
         try:
             # Пробуем подключиться и получить список инструментов
-            if self._session is None:
-                await self.connect()
-
-            assert self._session is not None
+            session = self._session or await self._ensure_connected()
 
             # Список инструментов - простой способ
             # проверить что сервер работает
-            tools_response = await self._session.list_tools()
+            tools_response = await session.list_tools()
             tool_names = [t.name for t in tools_response.tools]
 
             logger.info(
@@ -426,6 +1237,7 @@ class MCPClient:
 
 # Global client instance
 _mcp_client: Optional[MCPClient] = None
+_mcp_client_lock = asyncio.Lock()
 
 
 async def get_mcp_client() -> MCPClient:
@@ -438,8 +1250,12 @@ async def get_mcp_client() -> MCPClient:
     global _mcp_client
 
     if _mcp_client is None:
-        _mcp_client = MCPClient()
-        await _mcp_client.connect()
+        async with _mcp_client_lock:
+            # Повторная проверка: клиент мог создать другой task
+            if _mcp_client is None:
+                client = MCPClient()
+                await client.connect()
+                _mcp_client = client
 
     return _mcp_client
 
@@ -448,6 +1264,9 @@ async def close_mcp_client() -> None:
     '''Закрытие глобального экземпляра MCP клиента.'''
     global _mcp_client
 
-    if _mcp_client is not None:
-        await _mcp_client.close()
-        _mcp_client = None
+    async with _mcp_client_lock:
+        # Сбрасываем ссылку до закрытия, чтобы новые вызовы
+        # get_mcp_client не получили закрывающийся клиент
+        client, _mcp_client = _mcp_client, None
+        if client is not None:
+            await client.close()
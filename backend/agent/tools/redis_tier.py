@@ -0,0 +1,136 @@
+'''
+Разделяемый L2 кэш ответов MCP инструментов в Redis.
+
+L1 - кэш внутри процесса (MCPClient), L2 - Redis: общий для всех
+воркеров и переживает их перезапуск, L3 - сам MCP сервер. Ключи имеют
+вид mcp:{инструмент}:{аргумент}. Записи устаревают только по TTL.
+'''
+
+from collections.abc import Hashable
+from typing import Any, Optional
+
+import orjson
+import redis.asyncio as aioredis
+from loguru import logger
+from redis.exceptions import RedisError
+
+
+_KEY_PREFIX = 'mcp'
+
+
+def _decode(key: str, raw: bytes) -> Optional[dict[str, Any]]:
+    '''Разобрать запись Redis; поврежденная запись считается промахом.'''
+    try:
+        value = orjson.loads(raw)
+    except orjson.JSONDecodeError as e:
+        logger.warning('Некорректная запись Redis {}: {}', key, e)
+        return None
+    if not isinstance(value, dict):
+        logger.warning('Некорректная запись Redis {}: не объект', key)
+        return None
+    return value
+
+
+class RedisCache:
+    '''
+    L2 кэш ответов инструментов в Redis с TTL.
+
+    Ошибки Redis не прерывают вызовы инструментов: чтение считается
+    промахом, запись пропускается. Запись, которую не удается разобрать
+    как JSON, тоже считается промахом. При ttl=0 запись отключена.
+    '''
+
+    __slots__ = ('_redis', '_ttl')
+
+    def __init__(self, url: str, ttl: int) -> None:
+        '''
+        Инициализация L2 кэша.
+
+        Args:
+            url: URL Redis (redis://host:port/db)
+            ttl: Время жизни записи в секундах
+        '''
+        self._redis = aioredis.from_url(url)
+        self._ttl = ttl
+
+    @staticmethod
+    def make_key(tool_name: str, argument: Hashable) -> Optional[str]:
+        '''
+        Ключ Redis для вызова инструмента.
+
+        Args:
+            tool_name: Название инструмента
+            argument: Аргумент из ключа L1 кэша (VIN, запрос или дайджест)
+
+        Returns:
+            Ключ mcp:{инструмент}:{аргумент} или None, если у аргумента
+            нет стабильного строкового представления (несколько kwargs)
+        '''
+        if isinstance(argument, str):
+            return RedisCache.vin_key(tool_name, argument)
+        if isinstance(argument, bytes):
+            return f'{_KEY_PREFIX}:{tool_name}:{argument.hex()}'
+        return None
+
+    @staticmethod
+    def vin_key(tool_name: str, vin: str) -> str:
+        '''Ключ Redis для ответа VIN-инструмента.'''
+        return f'{_KEY_PREFIX}:{tool_name}:{vin}'
+
+    async def get(self, key: str) -> Optional[dict[str, Any]]:
+        '''Получить ответ инструмента из Redis (None при промахе).'''
+        try:
+            raw = await self._redis.get(key)
+        except RedisError as e:
+            logger.warning('Redis недоступен при чтении {}: {}', key, e)
+            return None
+        if raw is None:
+            return None
+        value = _decode(key, raw)
+        if value is not None:
+            logger.debug('Redis кэш hit для ключа: {}', key)
+        return value
+
+    async def set(self, key: str, value: dict[str, Any]) -> None:
+        '''Сохранить ответ инструмента в Redis с TTL.'''
+        # SET с EX 0 отклоняется Redis: при нулевом TTL L2 не пишется
+        if not self._ttl:
+            return
+        try:
+            await self._redis.set(key, orjson.dumps(value), ex=self._ttl)
+        except RedisError as e:
+            logger.warning('Redis недоступен при записи {}: {}', key, e)
+
+    async def get_many(
+        self, keys: list[str]
+    ) -> list[Optional[dict[str, Any]]]:
+        '''Получить несколько ответов одним MGET (None при промахе).'''
+        try:
+            raws = await self._redis.mget(keys)
+        except RedisError as e:
+            logger.warning(
+                'Redis недоступен при чтении {} ключей: {}', len(keys), e
+            )
+            return [None] * len(keys)
+        return [
+            None if raw is None else _decode(key, raw)
+            for key, raw in zip(keys, raws)
+        ]
+
+    async def set_many(self, items: dict[str, dict[str, Any]]) -> None:
+        '''Сохранить несколько ответов с TTL одним pipeline.'''
+        if not self._ttl or not items:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, orjson.dumps(value), ex=self._ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(
+                'Redis недоступен при записи {} ключей: {}', len(items), e
+            )
+
+    async def close(self) -> None:
+        '''Закрыть соединения с Redis.'''
+        await self._redis.aclose()
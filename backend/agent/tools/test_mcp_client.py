@@ -0,0 +1,212 @@
+'''
+Тесты MCPClient: повторные попытки при сбоях соединения и пакетный
+warranty_days_batch.
+
+Вместо MCP сервера используется поддельная сессия, которая поднимает
+те же исключения, что и ClientSession на Streamable HTTP транспорте.
+'''
+
+import asyncio
+
+import anyio
+import httpx
+import pytest
+from mcp.shared.exceptions import McpError
+from mcp.types import (
+    CONNECTION_CLOSED,
+    INVALID_PARAMS,
+    CallToolResult,
+    ErrorData,
+    TextContent,
+)
+
+from agent.config import MCPTools
+from agent.tools import mcp_client
+from agent.tools.mcp_client import (
+    MCPClient,
+    MCPConnectionError,
+    MCPValidationError,
+)
+
+
+TEST_VIN = 'XWEG3417BN0009095'
+
+
+class FakeSession:
+    '''Сессия, отвечающая заданной последовательностью исключений.'''
+
+    def __init__(self, outcomes: list[BaseException | str]) -> None:
+        self.outcomes = outcomes
+        self.calls = 0
+
+    async def call_tool(self, name: str, arguments: dict) -> CallToolResult:
+        outcome = self.outcomes[self.calls]
+        self.calls += 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return CallToolResult(
+            content=[TextContent(type='text', text=outcome)]
+        )
+
+
+def _mcp_error(code: int) -> McpError:
+    return McpError(ErrorData(code=code, message='error'))
+
+
+@pytest.fixture
+def connect_log(monkeypatch: pytest.MonkeyPatch) -> list[FakeSession]:
+    '''Подменяет подключение: каждое открывает сессию из того же списка.'''
+    sessions: list[FakeSession] = []
+
+    async def fake_connect(self: MCPClient) -> None:
+        if self._session is None:
+            self._session = self._fake
+            sessions.append(self._fake)
+
+    monkeypatch.setattr(MCPClient, 'connect', fake_connect)
+    monkeypatch.setattr(mcp_client.random, 'uniform', lambda a, b: 0.0)
+    return sessions
+
+
+def _client(session: FakeSession) -> MCPClient:
+    # __slots__ не позволяет добавить атрибут экземпляру
+    client_cls = type('FakeClient', (MCPClient,), {'_fake': session})
+    return client_cls(
+        base_url='http://mcp.test', max_retries=3, enable_cache=False
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'error',
+    [
+        _mcp_error(httpx.codes.REQUEST_TIMEOUT),
+        _mcp_error(CONNECTION_CLOSED),
+        _mcp_error(32600),
+        anyio.ClosedResourceError(),
+        anyio.BrokenResourceError(),
+    ],
+)
+async def test_retries_on_lost_connection(
+    connect_log: list[FakeSession], error: Exception
+) -> None:
+    session = FakeSession([error, 'ok'])
+    client = _client(session)
+
+    response = await client._call_tool(MCPTools.WARRANTY_DAYS, vin=TEST_VIN)
+
+    assert response['result'] == 'ok'
+    assert session.calls == 2
+    # Сессия после сбоя закрыта и открыта заново
+    assert len(connect_log) == 2
+
+
+@pytest.mark.asyncio
+async def test_raises_connection_error_when_retries_exhausted(
+    connect_log: list[FakeSession],
+) -> None:
+    session = FakeSession([anyio.ClosedResourceError()] * 3)
+    client = _client(session)
+
+    with pytest.raises(MCPConnectionError):
+        await client._call_tool(MCPTools.WARRANTY_DAYS, vin=TEST_VIN)
+
+    assert session.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_invalid_params(
+    connect_log: list[FakeSession],
+) -> None:
+    session = FakeSession([_mcp_error(INVALID_PARAMS), 'ok'])
+    client = _client(session)
+
+    with pytest.raises(MCPValidationError):
+        await client._call_tool(MCPTools.WARRANTY_DAYS, vin=TEST_VIN)
+
+    assert session.calls == 1
+
+
+OTHER_VIN = 'XWEG3417BN0009096'
+
+
+class BatchSession:
+    '''Сессия warranty_days_batch: отвечает после release, падает на bad.'''
+
+    def __init__(self, bad: frozenset[str] = frozenset()) -> None:
+        self.bad = bad
+        self.calls: list[tuple[str, dict]] = []
+        self.release = asyncio.Event()
+
+    async def call_tool(self, name: str, arguments: dict) -> CallToolResult:
+        self.calls.append((name, arguments))
+        await self.release.wait()
+        vins = arguments['vins']
+        if self.bad.intersection(vins):
+            raise _mcp_error(INVALID_PARAMS)
+        return CallToolResult(
+            content=[TextContent(type='text', text='batch')],
+            structuredContent={
+                'results': {
+                    vin: {'text': f'days {vin}', 'is_error': False}
+                    for vin in vins
+                }
+            },
+        )
+
+
+@pytest.mark.asyncio
+async def test_batch_shares_request_with_warranty_days(
+    connect_log: list[FakeSession],
+) -> None:
+    session = BatchSession()
+    client = _client(session)
+
+    batch = asyncio.create_task(
+        client.warranty_days_batch([TEST_VIN.lower()])
+    )
+    await asyncio.sleep(0)
+    single = asyncio.create_task(client.warranty_days(TEST_VIN))
+    await asyncio.sleep(0)
+    session.release.set()
+
+    results = await batch
+    assert results[TEST_VIN.lower()]['result'] == f'days {TEST_VIN}'
+    assert (await single)['result'] == f'days {TEST_VIN}'
+    assert session.calls == [
+        (MCPTools.WARRANTY_DAYS_BATCH, {'vins': [TEST_VIN]})
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_keeps_results_of_other_chunks(
+    connect_log: list[FakeSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(mcp_client.settings, 'mcp_batch_max_size', 1)
+    session = BatchSession(bad=frozenset({TEST_VIN}))
+    session.release.set()
+    client = _client(session)
+
+    results = await client.warranty_days_batch([TEST_VIN, OTHER_VIN])
+
+    assert isinstance(results[TEST_VIN], MCPValidationError)
+    assert results[OTHER_VIN]['result'] == f'days {OTHER_VIN}'
+    assert len(session.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_returns_cached_error_like_warranty_days(
+    connect_log: list[FakeSession],
+) -> None:
+    session = BatchSession()
+    client = _client(session)
+    cache_key = (MCPTools.WARRANTY_DAYS, TEST_VIN)
+    client._neg_cache[cache_key] = (MCPValidationError, 'bad vin')
+
+    with pytest.raises(MCPValidationError, match='bad vin'):
+        await client.warranty_days(TEST_VIN)
+    results = await client.warranty_days_batch([TEST_VIN])
+
+    assert isinstance(results[TEST_VIN], MCPValidationError)
+    assert str(results[TEST_VIN]) == 'bad vin'
+    assert session.calls == []
@@ -3,6 +3,8 @@
 from agent.utils.vin_validator import (
     VINValidator,
     validate_vin,
+    validate_and_normalize_vin,
+    validate_vins,
     normalize_vin,
 )
 from agent.utils.formatters import (
@@ -14,11 +16,18 @@ from agent.utils.formatters import (
     format_table,
     format_bullet_list,
     format_numbered_list,
+    truncate_text,
+    highlight_warning,
+    highlight_error,
+    highlight_success,
+    highlight_info,
 )
 
 __all__ = [
     'VINValidator',
     'validate_vin',
+    'validate_and_normalize_vin',
+    'validate_vins',
     'normalize_vin',
     'format_date',
     'format_currency',
@@ -28,4 +37,9 @@ __all__ = [
     'format_table',
     'format_bullet_list',
     'format_numbered_list',
+    'truncate_text',
+    'highlight_warning',
+    'highlight_error',
+    'highlight_success',
+    'highlight_info',
 ]
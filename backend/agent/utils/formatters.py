@@ -6,9 +6,68 @@
 (технических, пользовательских и т.д.).
 '''
 
+from enum import Enum
+from functools import lru_cache
 from typing import Any
 from datetime import datetime, date
 import json
+import math
+
+import orjson
+
+
+_CURRENCY_SYMBOLS = {
+    'RUB': '₽',
+    'USD': '$',
+    'EUR': '€',
+}
+
+# Префиксы подсветки сообщений
+_WARNING_PREFIX = '⚠️  ВНИМАНИЕ: '
+_ERROR_PREFIX = '❌ ОШИБКА: '
+_SUCCESS_PREFIX = '✅ '
+_INFO_PREFIX = 'ℹ️  '
+
+# orjson поддерживает только отступ 2; datetime и dataclass отдаются в
+# default=str, чтобы вывод совпадал с json.dumps
+_ORJSON_OPTIONS = (
+    orjson.OPT_INDENT_2
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+
+def _orjson_compatible(value: Any) -> bool:
+    '''
+    Проверить, что orjson сериализует value так же, как json.dumps.
+
+    Расходятся NaN/Infinity (orjson пишет null, json.dumps - NaN) и Enum,
+    не наследующие str/int/float (orjson пишет value, json.dumps через
+    default=str - str(member)), в том числе в ключах словарей.
+    '''
+    if isinstance(value, Enum):
+        return isinstance(value, (str, int, float))
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, dict):
+        return all(
+            (key is None or isinstance(key, (str, int, float)))
+            and _orjson_compatible(key)
+            and _orjson_compatible(item)
+            for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return all(map(_orjson_compatible, value))
+    return True
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> datetime:
+    '''Разбор ISO строки даты (результат кэшируется).'''
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
 
 
 def format_date(dt: datetime | date | str | None) -> str:
@@ -26,12 +85,12 @@ def format_date(dt: datetime | date | str | None) -> str:
 
     if isinstance(dt, str):
         try:
-            dt = datetime.fromisoformat(dt.replace('Z', '+00:00'))
+            dt = _parse_iso(dt)
         except ValueError:
             return dt
 
     if isinstance(dt, (datetime, date)):
-        return dt.strftime('%d.%m.%Y')
+        return f'{dt.day:02d}.{dt.month:02d}.{dt.year:04d}'
 
     return str(dt)
 
@@ -50,16 +109,24 @@ def format_currency(amount: float | int | None, currency: str = 'RUB') -> str:
     if amount is None:
         return 'Не указано'
 
-    symbols = {
-        'RUB': '₽',
-        'USD': '$',
-        'EUR': '€',
-    }
-
-    symbol = symbols.get(currency, currency)
+    symbol = _CURRENCY_SYMBOLS.get(currency, currency)
     return f'{amount:,.2f} {symbol}'.replace(',', ' ')
 
 
+def _day_suffix(days: int) -> str:
+    '''Склонение слова "день" для числа дней.'''
+    if days % 10 == 1 and days % 100 != 11:
+        return 'день'
+    elif days % 10 in (2, 3, 4) and days % 100 not in (12, 13, 14):
+        return 'дня'
+    else:
+        return 'дней'
+
+
+# Склонение зависит только от days % 100
+_DAY_SUFFIX = tuple(_day_suffix(d) for d in range(100))
+
+
 def format_duration_days(days: int | None) -> str:
     '''
     Форматирование продолжительности в днях с правильным русским склонением.
@@ -73,12 +140,7 @@ def format_duration_days(days: int | None) -> str:
     if days is None:
         return 'Не указано'
 
-    if days % 10 == 1 and days % 100 != 11:
-        return f'{days} день'
-    elif days % 10 in [2, 3, 4] and days % 100 not in [12, 13, 14]:
-        return f'{days} дня'
-    else:
-        return f'{days} дней'
+    return f'{days} {_DAY_SUFFIX[days % 100]}'
 
 
 def format_warranty_status(is_active: bool) -> str:
@@ -105,6 +167,14 @@ def format_json_output(data: Any, indent: int = 2) -> str:
     Returns:
         Строка JSON
     '''
+    if indent == 2 and _orjson_compatible(data):
+        try:
+            return orjson.dumps(
+                data, default=str, option=_ORJSON_OPTIONS
+            ).decode()
+        except orjson.JSONEncodeError:
+            # Например, целые числа больше 64 бит - отдаем stdlib json
+            pass
     return json.dumps(data, ensure_ascii=False, indent=indent, default=str)
 
 
@@ -125,13 +195,16 @@ def format_table(
     if not rows:
         return 'Нет данных'
 
-    # Calculate column widths
+    # Convert cells to strings once for both width and rendering passes
     num_cols = len(headers)
-    col_widths = [len(h) for h in headers]
+    str_rows = [[str(cell) for cell in row[:num_cols]] for row in rows]
 
-    for row in rows:
-        for i, cell in enumerate(row[:num_cols]):
-            col_widths[i] = max(col_widths[i], len(str(cell)))
+    # Calculate column widths
+    col_widths = [len(h) for h in headers]
+    for cells in str_rows:
+        for i, cell in enumerate(cells):
+            if len(cell) > col_widths[i]:
+                col_widths[i] = len(cell)
 
     # Adjust if total width exceeds max_width
     total_width = sum(col_widths) + (num_cols - 1) * 3 + 4
@@ -139,35 +212,17 @@ def format_table(
         reduction = (total_width - max_width) // num_cols
         col_widths = [max(10, w - reduction) for w in col_widths]
 
-    # Build table
+    # Build table: one format string renders a whole line
     separator = '+' + '+'.join('-' * (w + 2) for w in col_widths) + '+'
-    lines = [separator]
-
-    # Headers
-    header_line = (
-        '| '
-        + ' | '.join(h.ljust(col_widths[i]) for i, h in enumerate(headers))
-        + ' |'
-    )
-    lines.append(header_line)
-    lines.append(separator)
+    line_format = '| ' + ' | '.join(f'{{:<{w}}}' for w in col_widths) + ' |'
+    lines = [separator, line_format.format(*headers), separator]
 
-    # Rows
-    for row in rows:
-        cells = [str(cell) for cell in row[:num_cols]]
-        # Truncate if needed
-        cells = [
-            (c[:col_widths[i] - 3] + '...' if len(c) > col_widths[i] else c)
-            for i, c in enumerate(cells)
-        ]
-        row_line = (
-            '| '
-            + ' | '.join(cells[i].ljust(
-                col_widths[i]) for i in range(num_cols)
-                )
-            + ' |'
-        )
-        lines.append(row_line)
+    # Rows (truncate cells wider than the column)
+    for cells in str_rows:
+        lines.append(line_format.format(*(
+            c if len(c) <= w else c[:w - 3] + '...'
+            for c, w in zip(cells, col_widths)
+        )))
 
     lines.append(separator)
     return '\n'.join(lines)
@@ -236,7 +291,7 @@ def highlight_warning(text: str) -> str:
     Returns:
         Форматированный текст предупреждения
     '''
-    return f'⚠️  ВНИМАНИЕ: {text}'
+    return _WARNING_PREFIX + text
 
 
 def highlight_error(text: str) -> str:
@@ -249,7 +304,7 @@ def highlight_error(text: str) -> str:
     Returns:
         Форматированный текст ошибки
     '''
-    return f'❌ ОШИБКА: {text}'
+    return _ERROR_PREFIX + text
 
 
 def highlight_success(text: str) -> str:
@@ -262,7 +317,7 @@ def highlight_success(text: str) -> str:
     Returns:
         Форматированный текст успешного результата
     '''
-    return f'✅ {text}'
+    return _SUCCESS_PREFIX + text
 
 
 def highlight_info(text: str) -> str:
@@ -275,4 +330,4 @@ def highlight_info(text: str) -> str:
     Returns:
         Форматированный текст информации
     '''
-    return f'ℹ️  {text}'
+    return _INFO_PREFIX + text
@@ -5,16 +5,29 @@
 с международными стандартами.
 '''
 
-import re
+from collections.abc import Iterable
+from functools import lru_cache
+from operator import mul
 from typing import Optional
 
 
+# Допустимые символы VIN: латинские буквы без I, O, Q и цифры
+_VIN_CHARS = 'ABCDEFGHJKLMNPRSTUVWXYZ0123456789'
+# Таблица str.translate, удаляющая допустимые символы: остаются
+# только недопустимые
+_VIN_DROP_ALLOWED = str.maketrans('', '', _VIN_CHARS)
+
+# Таблица для bytes.translate: допустимый символ -> 1, остальные -> 0.
+# Проверка VIN - один проход translate на C вместо regex
+_VIN_ALLOWED = bytes(
+    1 if chr(code) in _VIN_CHARS else 0 for code in range(256)
+)
+_VIN_ALL_ALLOWED = b'\x01' * 17
+
+
 class VINValidator:
     '''Валидатор для VIN номеров.'''
 
-    # VIN должен содержать ровно 17 символов, за исключением I, O, Q
-    VIN_PATTERN = re.compile(r'^[A-HJ-NPR-Z0-9]{17}$')
-
     # Значения транслитерации для расчета контрольной цифры VIN
     TRANSLITERATION = {
         'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8,
@@ -25,27 +38,122 @@ class VINValidator:
     }
 
     # Весовые коэффициенты для расчета контрольной цифры
-    WEIGHTS = [8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2]
+    WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
 
     @classmethod
-    def validate(cls, vin: str) -> tuple[bool, Optional[str]]:
+    def compute_check_digit(cls, vin: str) -> str:
+        '''
+        Расчет контрольной цифры VIN (позиция 9) по ISO 3779.
+
+        Args:
+            vin: Нормализованный VIN из 17 допустимых символов
+
+        Returns:
+            Контрольная цифра: '0'-'9' или 'X'
+        '''
+        values = vin.encode().translate(_TRANSLIT)
+        return chr(_CHECK_DIGITS[_check_remainder(values)])
+
+    @classmethod
+    def validate(
+        cls, vin: str, check_digit: bool = False
+    ) -> tuple[bool, Optional[str]]:
         '''
         Валидация VIN номера.
 
+        Контрольная цифра проверяется только при check_digit=True:
+        она обязательна для VIN Северной Америки, но VIN российской
+        и европейской сборки часто ее не содержат.
+
         Args:
             vin: VIN номер для валидации
+            check_digit: Проверять контрольную цифру (позиция 9)
 
         Returns:
             Кортеж из (is_valid, error_message)
             Если валидный, error_message равен None
             Если невалидный, error_message описывает проблему
         '''
+        is_valid, error_message, _ = cls.validate_and_normalize(
+            vin, check_digit
+        )
+        return is_valid, error_message
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def validate_and_normalize(
+        cls, vin: str, check_digit: bool = False
+    ) -> tuple[bool, Optional[str], str]:
+        '''
+        Валидация VIN с возвратом нормализованного значения.
+
+        Позволяет заменить пару validate_vin + normalize_vin одним
+        вызовом: нормализация выполняется один раз. Результат
+        кэшируется: инструменты агента получают один и тот же VIN
+        многократно за сессию.
+
+        Args:
+            vin: VIN номер для валидации
+            check_digit: Проверять контрольную цифру (позиция 9)
+
+        Returns:
+            Кортеж из (is_valid, error_message, normalized_vin)
+        '''
         if not vin:
-            return False, 'VIN не может быть пустым'
+            return False, 'VIN не может быть пустым', vin
+
+        vin = cls._normalize_fast(vin)
+        is_valid, error_message = cls._validate_normalized(vin, check_digit)
+        return is_valid, error_message, vin
+
+    @classmethod
+    def validate_many(
+        cls, vins: bytes, check_digit: bool = False
+    ) -> list[bool]:
+        '''
+        Пакетная проверка допустимости символов VIN.
+
+        Весь буфер проходит через один вызов translate, после чего
+        каждый VIN сравнивается с эталоном побайтово на C. Для проверки
+        контрольных цифр буфер транслитерируется также одним вызовом.
+
+        Args:
+            vins: Нормализованные VIN, записанные подряд по 17 байт
+                (например, b''.join(vin.encode() for vin in batch))
+            check_digit: Проверять контрольную цифру (позиция 9)
+
+        Returns:
+            Список флагов допустимости для каждого VIN
+
+        Raises:
+            ValueError: Если длина буфера не кратна 17
+        '''
+        if len(vins) % 17:
+            raise ValueError(
+                f'Длина буфера VIN должна быть кратна 17, получено: '
+                f'{len(vins)}'
+            )
 
-        # Convert to uppercase and strip whitespace
-        vin = vin.upper().strip()
+        flags = vins.translate(_VIN_ALLOWED)
+        result = [
+            flags[i:i + 17] == _VIN_ALL_ALLOWED
+            for i in range(0, len(flags), 17)
+        ]
 
+        if check_digit:
+            values = vins.translate(_TRANSLIT)
+            for idx, is_valid in enumerate(result):
+                if is_valid:
+                    start = idx * 17
+                    remainder = _check_remainder(values[start:start + 17])
+                    result[idx] = vins[start + 8] == _CHECK_DIGITS[remainder]
+        return result
+
+    @classmethod
+    def _validate_normalized(
+        cls, vin: str, check_digit: bool
+    ) -> tuple[bool, Optional[str]]:
+        '''Валидация уже нормализованного непустого VIN.'''
         # Check length
         if len(vin) != 17:
             return (
@@ -53,21 +161,50 @@ class VINValidator:
                 f'VIN должен содержать 17 символов, получено: {len(vin)}',
                 )
 
-        # Check pattern
-        if not cls.VIN_PATTERN.match(vin):
-            invalid_chars = set(
-                c for c in vin if c in 'IOQ' or not c.isalnum()
-                )
-            if invalid_chars:
+        # Check characters
+        if not (
+            vin.isascii()
+            and vin.encode().translate(_VIN_ALLOWED) == _VIN_ALL_ALLOWED
+        ):
+            # Уникальные символы в отсортированном виде: сообщение
+            # стабильно для одного и того же VIN
+            invalid_chars = sorted(set(vin.translate(_VIN_DROP_ALLOWED)))
+            return (
+                False,
+                f'VIN содержит недопустимые символы: '
+                f'{", ".join(invalid_chars)}',
+            )
+
+        if check_digit:
+            expected = cls.compute_check_digit(vin)
+            if vin[8] != expected:
                 return (
                     False,
-                    f'VIN содержит недопустимые символы: '
-                    f'{", ".join(invalid_chars)}',
+                    f'Неверная контрольная цифра VIN: ожидается {expected}, '
+                    f'получено {vin[8]}',
                 )
-            return False, 'VIN содержит недопустимые символы'
 
         return True, None
 
+    @staticmethod
+    def _normalize_fast(vin: str) -> str:
+        '''
+        Нормализация VIN без выделения памяти в типичном случае.
+
+        Уже нормализованный VIN (17 ASCII символов в верхнем регистре
+        без пробелов) возвращается как есть.
+        '''
+        if (
+            len(vin) == 17
+            and vin.isascii()
+            and vin.isalnum()
+            and vin.isupper()
+        ):
+            return vin
+        vin = vin.strip()
+        # Верхний регистр без строчных букв не требует копии через upper()
+        return vin if vin.isupper() else vin.upper()
+
     @classmethod
     def normalize(cls, vin: str) -> str:
         '''
@@ -80,7 +217,7 @@ class VINValidator:
         Returns:
             Нормализованный VIN строка
         '''
-        return vin.upper().strip()
+        return cls._normalize_fast(vin)
 
     @classmethod
     def extract_info(cls, vin: str) -> dict[str, str]:
@@ -100,28 +237,96 @@ class VINValidator:
             - serial: Serial number (позиции 12-17)
         '''
         vin = cls.normalize(vin)
+        # Код года, завода и серийный номер лежат внутри VIS
+        vis = vin[9:17]
 
         return {
-            'wmi': vin[0:3],
+            'wmi': vin[:3],
             'vds': vin[3:9],
-            'vis': vin[9:17],
-            'year_code': vin[9],
-            'plant_code': vin[10],
-            'serial': vin[11:17],
+            'vis': vis,
+            'year_code': vis[0],
+            'plant_code': vis[1],
+            'serial': vis[2:],
         }
 
 
-def validate_vin(vin: str) -> tuple[bool, Optional[str]]:
+# Значения транслитерации по коду символа (0 для недопустимых символов)
+_TRANSLIT = bytes(
+    VINValidator.TRANSLITERATION.get(chr(code), 0) for code in range(256)
+)
+# Весовые коэффициенты в виде bytes: итерация сразу дает int
+_WEIGHTS_B = bytes(VINValidator.WEIGHTS)
+# Символ контрольной цифры по остатку от деления на 11
+_CHECK_DIGITS = b'0123456789X'
+
+
+def _check_remainder(values: bytes) -> int:
+    '''Остаток взвешенной суммы транслитерированных символов VIN.'''
+    return sum(map(mul, values, _WEIGHTS_B)) % 11
+
+
+def validate_vin(
+    vin: str, check_digit: bool = False
+) -> tuple[bool, Optional[str]]:
     '''
     Удобная функция для валидации VIN.
 
     Args:
         vin: VIN номер для валидации
+        check_digit: Проверять контрольную цифру (позиция 9)
 
     Returns:
         Кортеж из (is_valid, error_message)
     '''
-    return VINValidator.validate(vin)
+    return VINValidator.validate(vin, check_digit)
+
+
+def validate_and_normalize_vin(
+    vin: str, check_digit: bool = False
+) -> tuple[bool, Optional[str], str]:
+    '''
+    Удобная функция для валидации и нормализации VIN за один вызов.
+
+    Args:
+        vin: VIN номер для валидации
+        check_digit: Проверять контрольную цифру (позиция 9)
+
+    Returns:
+        Кортеж из (is_valid, error_message, normalized_vin)
+    '''
+    return VINValidator.validate_and_normalize(vin, check_digit)
+
+
+def validate_vins(
+    vins: Iterable[str], check_digit: bool = False
+) -> list[bool]:
+    '''
+    Пакетная валидация VIN.
+
+    VIN нормализуются, VIN подходящей длины из ASCII символов
+    упаковываются в один буфер и проверяются одним вызовом
+    VINValidator.validate_many.
+
+    Args:
+        vins: VIN номера для валидации
+        check_digit: Проверять контрольную цифру (позиция 9)
+
+    Returns:
+        Список флагов валидности в порядке входных VIN
+    '''
+    normalized = [VINValidator.normalize(vin) if vin else '' for vin in vins]
+    packable = [
+        idx for idx, vin in enumerate(normalized)
+        if len(vin) == 17 and vin.isascii()
+    ]
+    flags = VINValidator.validate_many(
+        ''.join(normalized[idx] for idx in packable).encode(), check_digit
+    )
+
+    result = [False] * len(normalized)
+    for idx, is_valid in zip(packable, flags):
+        result[idx] = is_valid
+    return result
 
 
 def normalize_vin(vin: str) -> str:
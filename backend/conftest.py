@@ -0,0 +1,19 @@
+'''
+Общие настройки pytest.
+
+Настройки агента и MCP сервера читаются из окружения при импорте
+пакетов; обязательные параметры Cloud-RAG для тестов не нужны.
+'''
+
+import os
+
+
+for _name in (
+    'KEY_ID',
+    'KEY_SECRET',
+    'AUTH_URL',
+    'RETRIEVE_URL_TEMPLATE',
+    'KNOWLEDGE_BASE_ID',
+    'EVOLUTION_PROJECT_ID',
+):
+    os.environ.setdefault(_name, 'test')
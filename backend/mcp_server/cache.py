@@ -0,0 +1,80 @@
+"""
+Общий кэш ответов backend API и RAG API в Redis.
+
+Кэш разделяется всеми процессами MCP сервера и переживает их
+перезапуск. Запись хранится дольше своего TTL: устаревший ответ
+отдается, если backend API недоступен. Для вытеснения редко
+используемых ключей Redis настраивается с maxmemory-policy allkeys-lfu.
+"""
+
+import time
+from typing import Any
+
+import orjson
+import redis.asyncio as aioredis
+from loguru import logger
+from redis.exceptions import RedisError
+
+
+_KEY_PREFIX = 'mcp-server'
+
+
+class RedisResponseCache:
+    """
+    Кэш ответов в Redis с TTL свежести и окном устаревших данных.
+
+    Ошибки Redis и некорректные записи не прерывают вызовы инструментов:
+    чтение считается промахом, запись пропускается.
+    """
+
+    __slots__ = ('_redis', '_stale_ttl')
+
+    def __init__(self, url: str, stale_ttl: int) -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            url: URL Redis (redis://host:port/db)
+            stale_ttl: Сколько секунд после истечения TTL запись
+                хранится для отдачи при недоступности backend API
+        """
+        self._redis = aioredis.from_url(url)
+        self._stale_ttl = stale_ttl
+
+    async def get(self, key: str) -> tuple[Any, bool] | None:
+        """
+        Получить ответ из кэша.
+
+        Returns:
+            Кортеж из (данные, свежие ли данные) или None при промахе
+        """
+        try:
+            raw = await self._redis.get(f'{_KEY_PREFIX}:{key}')
+        except RedisError as e:
+            logger.warning('Redis недоступен при чтении {}: {}', key, e)
+            return None
+        if raw is None:
+            return None
+        try:
+            entry = orjson.loads(raw)
+            return entry['data'], time.time() < entry['expires_at']
+        except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+            # Поврежденная или чужая запись считается промахом
+            logger.warning('Некорректная запись Redis {}: {!r}', key, e)
+            return None
+
+    async def set(self, key: str, data: Any, ttl: int) -> None:
+        """Сохранить ответ: свежим на ttl секунд, затем устаревшим."""
+        entry = {'expires_at': time.time() + ttl, 'data': data}
+        try:
+            await self._redis.set(
+                f'{_KEY_PREFIX}:{key}',
+                orjson.dumps(entry),
+                ex=ttl + self._stale_ttl,
+            )
+        except RedisError as e:
+            logger.warning('Redis недоступен при записи {}: {}', key, e)
+
+    async def close(self) -> None:
+        """Закрыть соединения с Redis."""
+        await self._redis.aclose()
@@ -6,6 +6,7 @@
 '''
 
 import os
+from functools import lru_cache
 from typing import Literal
 
 from pydantic import Field, field_validator
@@ -69,6 +70,63 @@ class MCPConfig(BaseSettings):
     # External API Configuration
     api_key: str = 'your-api-key'
     api_url: str = 'http://127.0.0.1:8000'
+    api_http2: bool = Field(
+        default=True,
+        description='Использовать HTTP/2 для соединений с backend API'
+    )
+    trust_api_payloads: bool = Field(
+        default=True,
+        description=(
+            'Создавать модели из ответов backend API без валидации'
+        )
+    )
+    api_cache_ttl: int = Field(
+        default=60,
+        ge=0,
+        description='TTL кэша ответов backend API в секундах (0 - отключен)'
+    )
+    api_cache_max: int = Field(
+        default=512,
+        ge=1,
+        description='Максимальное количество ответов backend API в кэше'
+    )
+    api_redis_url: str = Field(
+        default='',
+        description='URL Redis для общего кэша ответов (пусто - отключен)'
+    )
+    api_redis_ttl: int = Field(
+        default=3600,
+        ge=1,
+        description='TTL ответов базы знаний в Redis в секундах'
+    )
+    api_redis_short_ttl: int = Field(
+        default=300,
+        ge=1,
+        description=(
+            'TTL ответов backend API (статистика дней в ремонте '
+            'и истории обращений) в Redis в секундах'
+        )
+    )
+    api_redis_stale_ttl: int = Field(
+        default=86400,
+        ge=0,
+        description=(
+            'Сколько секунд устаревший ответ хранится в Redis '
+            'для отдачи при недоступности backend API'
+        )
+    )
+
+    # Batch Tools Configuration
+    batch_max_calls: int = Field(
+        default=32,
+        ge=1,
+        description='Максимальное количество вызовов в одном batch_call'
+    )
+    batch_max_vins: int = Field(
+        default=50,
+        ge=1,
+        description='Максимальное количество VIN в warranty_days_batch'
+    )
 
     # Application Configuration
     app_name: str = Field(
@@ -97,8 +155,14 @@ class MCPConfig(BaseSettings):
         return value.rstrip('/')
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> MCPConfig:
+    '''Получить настройки (.env читается один раз за процесс).'''
+    return MCPConfig()
+
+
 # Global settings instance
-settings = MCPConfig()
+settings = get_settings()
 
 
 # MCP Tool names
@@ -106,18 +170,24 @@ class MCPTools:
     '''Идентификаторы MCP инструментов.'''
 
     WARRANTY_DAYS = 'warranty_days'
+    WARRANTY_DAYS_BATCH = 'warranty_days_batch'
     WARRANTY_HISTORY = 'warranty_history'
     MAINTENANCE_HISTORY = 'maintenance_history'
     VEHICLE_REPAIRS_HISTORY = 'vehicle_repairs_history'
     COMPLIANCE_RAG = 'compliance_rag'
+    BATCH_CALL = 'batch_call'
+
+    _ALL_TOOLS = (
+        WARRANTY_DAYS,
+        WARRANTY_DAYS_BATCH,
+        WARRANTY_HISTORY,
+        MAINTENANCE_HISTORY,
+        VEHICLE_REPAIRS_HISTORY,
+        COMPLIANCE_RAG,
+        BATCH_CALL,
+    )
 
     @classmethod
-    def all_tools(cls) -> list[str]:
-        '''Return list of all available MCP tools.'''
-        return [
-            cls.WARRANTY_DAYS,
-            cls.WARRANTY_HISTORY,
-            cls.MAINTENANCE_HISTORY,
-            cls.VEHICLE_REPAIRS_HISTORY,
-            cls.COMPLIANCE_RAG,
-        ]
+    def all_tools(cls) -> tuple[str, ...]:
+        '''Return all available MCP tools.'''
+        return cls._ALL_TOOLS
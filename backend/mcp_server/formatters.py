@@ -1,5 +1,6 @@
 """Функции форматирования текстовых описаний для MCP tools."""
 
+from functools import lru_cache
 from typing import List
 from mcp_server.models import (
     RepairYear,
@@ -10,6 +11,16 @@ from mcp_server.models import (
 )
 
 
+# Строка таблицы warranty_days: метка года и число дней с выравниванием
+_WARRANTY_DAYS_ROW = '| {:<20} | {:<14} |'
+
+
+@lru_cache(maxsize=8192)
+def _format_odometer(odometer: int) -> str:
+    """Пробег с разделителем тысяч (кэшируется: значения повторяются)."""
+    return f'{odometer:,}'
+
+
 def format_warranty_days_text(
     vin: str,
     repair_years: List[RepairYear],
@@ -29,22 +40,24 @@ def format_warranty_days_text(
     if not repair_years:
         return f'Для VIN {vin}: записи не найдены'
 
-    lines = ['## СТАТИСТИКА ДНЕЙ В РЕМОНТЕ']
-    lines.append('')
-    lines.append('| Год владения | Дней в ремонте |')
-    lines.append('|--------------|----------------|')
-
-    for year in repair_years:
-        year_label = f'{year.year_number}-й год'
-        if year.is_current_year:
-            year_label += ' (текущий)'
-        days_label = f'{year.days_in_repair} дней'
-        lines.append(f'| {year_label:<20} | {days_label:<14} |')
-
-    lines.append('')
-    lines.append(f'**Итого за все годы: {total_days} дней**')
+    rows = '\n'.join(
+        _WARRANTY_DAYS_ROW.format(
+            f'{year.year_number}-й год'
+            + (' (текущий)' if year.is_current_year else ''),
+            f'{year.days_in_repair} дней',
+        )
+        for year in repair_years
+    )
 
-    return '\n'.join(lines)
+    return (
+        '## СТАТИСТИКА ДНЕЙ В РЕМОНТЕ\n'
+        '\n'
+        '| Год владения | Дней в ремонте |\n'
+        '|--------------|----------------|\n'
+        f'{rows}\n'
+        '\n'
+        f'**Итого за все годы: {total_days} дней**'
+    )
 
 
 def format_warranty_history_text(
@@ -68,44 +81,50 @@ def format_warranty_history_text(
     if not records:
         return f'Для VIN {vin}: записи не найдены'
 
-    lines = [f'История гарантийных обращений VIN {vin}']
-    lines.append(f'Всего обращений: {len(records)}')
-    lines.append(f'Всего заменено деталей: {total_parts}')
-    lines.append(f'Всего выполнено работ: {total_operations}')
-    lines.append('')
+    # Каждый блок - несколько строк текста; блоки соединяются
+    # переводом строки, завершающий '\n' блока дает пустую строку
+    blocks = [
+        f'История гарантийных обращений VIN {vin}\n'
+        f'Всего обращений: {len(records)}\n'
+        f'Всего заменено деталей: {total_parts}\n'
+        f'Всего выполнено работ: {total_operations}\n'
+    ]
 
     for idx, record in enumerate(records, 1):
-        lines.append(f'═══ Обращение {idx} ═══')
-        lines.append(
-            f'Гарантийное требование {record.serial} от {record.date}'
+        # Вложенные модели читаются один раз
+        dealer = record.dealer
+        fault_part = record.fault_part
+        blocks.append(
+            f'═══ Обращение {idx} ═══\n'
+            f'Гарантийное требование {record.serial} от {record.date}\n'
+            f'Пробег: {_format_odometer(record.odometer)} км\n'
+            f'Дилер: {dealer.name} ({dealer.city})\n'
+            '\n'
+            f'Деталь-виновник: {fault_part.part_number}\n'
+            f'Описание: {fault_part.description}\n'
         )
-        lines.append(f'Пробег: {record.odometer:,} км')
-        lines.append(
-            f'Дилер: {record.dealer.name} ({record.dealer.city})'
-        )
-        lines.append('')
-
-        lines.append(
-            f'Деталь-виновник: {record.fault_part.part_number}'
-        )
-        lines.append(f'Описание: {record.fault_part.description}')
-        lines.append('')
 
         if record.replaced_parts:
-            lines.append('Замененные детали:')
-            for part in record.replaced_parts:
-                lines.append(
-                    f'  • {part.part_number}: {part.description}'
+            blocks.append(
+                'Замененные детали:'
+                + ''.join(
+                    f'\n  • {part.part_number}: {part.description}'
+                    for part in record.replaced_parts
                 )
-            lines.append('')
+                + '\n'
+            )
 
         if record.operations:
-            lines.append('Выполненные работы:')
-            for op in record.operations:
-                lines.append(f'  • {op.code}: {op.description}')
-            lines.append('')
+            blocks.append(
+                'Выполненные работы:'
+                + ''.join(
+                    f'\n  • {op.code}: {op.description}'
+                    for op in record.operations
+                )
+                + '\n'
+            )
 
-    return '\n'.join(lines)
+    return '\n'.join(blocks)
 
 
 def format_maintenance_history_text(
@@ -125,22 +144,21 @@ def format_maintenance_history_text(
     if not records:
         return f'Для VIN {vin}: записи не найдены'
 
-    lines = [f'История технического обслуживания VIN {vin}']
-    lines.append(f'Всего записей: {len(records)}')
-    lines.append('')
-
+    blocks = [
+        f'История технического обслуживания VIN {vin}\n'
+        f'Всего записей: {len(records)}\n'
+    ]
     for idx, record in enumerate(records, 1):
-        lines.append(f'{idx}. {record.maintenance_type}')
-        lines.append(f'   Дата: {record.date}')
-        lines.append(f'   Пробег: {record.odometer:,} км')
-        lines.append(
-            f'   Дилер: {record.dealer.name}, '
-            f'код {record.dealer.code or "N/A"} '
-            f'({record.dealer.city})'
+        dealer = record.dealer
+        blocks.append(
+            f'{idx}. {record.maintenance_type}\n'
+            f'   Дата: {record.date}\n'
+            f'   Пробег: {_format_odometer(record.odometer)} км\n'
+            f'   Дилер: {dealer.name}, код {dealer.code or "N/A"} '
+            f'({dealer.city})\n'
         )
-        lines.append('')
 
-    return '\n'.join(lines)
+    return '\n'.join(blocks)
 
 
 def format_vehicle_repairs_history_text(
@@ -160,21 +178,22 @@ def format_vehicle_repairs_history_text(
     if not records:
         return f'Для VIN {vin}: записи не найдены'
 
-    lines = [f'История ремонтов из дилерской сети для VIN {vin}']
-    lines.append(f'Всего визитов: {len(records)}')
-    lines.append('')
-
-    for idx, record in enumerate(records, 1):
-        lines.append(f'═══ Визит {idx} ═══')
-        lines.append(f'Дилер: {record.dealer_name}')
-        lines.append(f'Дата: {record.date}')
-        lines.append(f'Пробег: {record.odometer:,} км')
-        lines.append(f'Тип ремонта: {record.repair_type}')
-        lines.append(f'Причина визита: {record.visit_reason}')
-        lines.append(f'Рекомендации: {record.recommendations}')
-        lines.append('')
+    blocks = [
+        f'История ремонтов из дилерской сети для VIN {vin}\n'
+        f'Всего визитов: {len(records)}\n'
+    ]
+    blocks.extend(
+        f'═══ Визит {idx} ═══\n'
+        f'Дилер: {record.dealer_name}\n'
+        f'Дата: {record.date}\n'
+        f'Пробег: {_format_odometer(record.odometer)} км\n'
+        f'Тип ремонта: {record.repair_type}\n'
+        f'Причина визита: {record.visit_reason}\n'
+        f'Рекомендации: {record.recommendations}\n'
+        for idx, record in enumerate(records, 1)
+    )
 
-    return '\n'.join(lines)
+    return '\n'.join(blocks)
 
 
 def format_compliance_rag_text(
@@ -196,27 +215,27 @@ def format_compliance_rag_text(
     if not documents:
         return f'По запросу "{query}" документы не найдены'
 
-    lines = [f'Результаты поиска по запросу: "{query}"']
-    lines.append(f'Найдено документов: {len(documents)}')
-    lines.append('')
+    blocks = [
+        f'Результаты поиска по запросу: "{query}"\n'
+        f'Найдено документов: {len(documents)}\n'
+    ]
 
     for idx, doc in enumerate(documents, 1):
-        lines.append(f'─── Документ {idx} ───')
-
         content = doc.content
+        # Длинный документ копируется только в пределах обрезки
         if len(content) > max_content_length:
-            content = content[:max_content_length] + '...'
-        lines.append(f'Содержание: {content}')
+            content = f'{content[:max_content_length]}...'
+        block = f'─── Документ {idx} ───\nСодержание: {content}\n'
 
         if doc.metadata:
             metadata_str = ', '.join(
                 f'{k}: {v}' for k, v in doc.metadata.items()
             )
-            lines.append(f'Метаданные: {metadata_str}')
+            block += f'Метаданные: {metadata_str}\n'
 
         if doc.relevance_score is not None:
-            lines.append(f'Релевантность: {doc.relevance_score:.2f}')
+            block += f'Релевантность: {doc.relevance_score:.2f}\n'
 
-        lines.append('')
+        blocks.append(block)
 
-    return '\n'.join(lines)
+    return '\n'.join(blocks)
@@ -1,7 +1,66 @@
 """Pydantic модели для структурированных ответов MCP tools."""
-from typing import List, Optional, Any
+from functools import cache
+from types import NoneType, UnionType
+from typing import Any, List, Optional, Self, Union, get_args, get_origin
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Скалярные типы полей, которые приводятся при создании без валидации
+_SCALAR_TYPES = (int, float, str)
+
+
+def _scalar_type(annotation: Any) -> type | None:
+    """Скалярный тип поля (int, float, str или Optional от них)."""
+    if annotation in _SCALAR_TYPES:
+        return annotation
+    if get_origin(annotation) in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) == 1 and args[0] in _SCALAR_TYPES:
+            return args[0]
+    return None
+
+
+class _Model(BaseModel):
+    """
+    Базовая модель ответов MCP tools.
+
+    output_schema инструментов задается вручную, поэтому схема валидации
+    строится при первом создании экземпляра, а не при импорте модуля.
+    """
+
+    model_config = ConfigDict(defer_build=True)
+
+    @classmethod
+    def from_api(cls, *, trusted: bool = False, **fields: Any) -> Self:
+        """
+        Создать модель из ответа backend API.
+
+        При trusted (настройка trust_api_payloads сервера) модель
+        создается через model_construct без валидации, но скалярные
+        поля int, float и str приводятся к своему типу, как в pydantic:
+        пробег строкой или float из API остается числом для форматтеров
+        и model_dump. Данные пользователя (например, запрос
+        compliance_rag) передаются в обычный конструктор.
+        """
+        if not trusted:
+            return cls(**fields)
+        for name, cast in cls._scalar_fields().items():
+            value = fields.get(name)
+            if value is not None and type(value) is not cast:
+                fields[name] = cast(value)
+        return cls.model_construct(**fields)
+
+    @classmethod
+    @cache
+    def _scalar_fields(cls) -> dict[str, type]:
+        """Скалярные поля модели и их типы (вычисляются один раз)."""
+        fields: dict[str, type] = {}
+        for name, info in cls.model_fields.items():
+            scalar = _scalar_type(info.annotation)
+            if scalar is not None:
+                fields[name] = scalar
+        return fields
 
 
 # ============================================================================
@@ -9,7 +68,7 @@ from pydantic import BaseModel, Field, field_validator
 # ============================================================================
 
 
-class RepairYear(BaseModel):
+class RepairYear(_Model):
     """Информация о годе владения и днях в ремонте."""
 
     year_number: int = Field(description='Номер года владения')
@@ -17,7 +76,7 @@ class RepairYear(BaseModel):
     days_in_repair: int = Field(description='Количество дней в ремонте')
 
 
-class WarrantyDaysStructured(BaseModel):
+class WarrantyDaysStructured(_Model):
     """Структурированный ответ для warranty_days tool."""
 
     vin: str = Field(description='VIN номер автомобиля')
@@ -38,44 +97,40 @@ class WarrantyDaysStructured(BaseModel):
 # ============================================================================
 
 
-class Dealer(BaseModel):
+class Dealer(_Model):
     """Информация о дилере."""
 
+    # Числовой code из API приводится к str в pydantic-core,
+    # без Python-валидатора на каждый экземпляр
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
     name: str = Field(description='Название дилера')
     code: Optional[str] = Field(None, description='Код дилера')
     city: str = Field(description='Город')
 
-    @field_validator('code', mode='before')
-    @classmethod
-    def convert_code_to_string(cls, value: Any) -> Optional[str]:
-        """Конвертирует code из int в str при необходимости."""
-        if value is None:
-            return None
-        return str(value)
-
 
-class ReplacedPart(BaseModel):
+class ReplacedPart(_Model):
     """Информация о замененной детали."""
 
     part_number: str = Field(description='Каталожный номер детали')
     description: str = Field(description='Описание детали')
 
 
-class Operation(BaseModel):
+class Operation(_Model):
     """Информация о выполненной операции."""
 
     code: str = Field(description='Код операции')
     description: str = Field(description='Описание выполненной работы')
 
 
-class FaultPart(BaseModel):
+class FaultPart(_Model):
     """Информация о детали-виновнике."""
 
     part_number: str = Field(description='Каталожный номер детали-виновника')
     description: str = Field(description='Описание детали-виновника')
 
 
-class WarrantyRecord(BaseModel):
+class WarrantyRecord(_Model):
     """Запись о гарантийном обращении."""
 
     serial: str = Field(description='Номер гарантийного требования')
@@ -93,7 +148,7 @@ class WarrantyRecord(BaseModel):
     )
 
 
-class WarrantyHistoryStructured(BaseModel):
+class WarrantyHistoryStructured(_Model):
     """Структурированный ответ для warranty_history tool."""
 
     vin: str = Field(description='VIN номер автомобиля')
@@ -116,7 +171,7 @@ class WarrantyHistoryStructured(BaseModel):
 # ============================================================================
 
 
-class MaintenanceRecord(BaseModel):
+class MaintenanceRecord(_Model):
     """Запись о техническом обслуживании."""
 
     vin: str = Field(description='VIN номер автомобиля')
@@ -126,7 +181,7 @@ class MaintenanceRecord(BaseModel):
     dealer: Dealer = Field(description='Информация о дилере')
 
 
-class MaintenanceHistoryStructured(BaseModel):
+class MaintenanceHistoryStructured(_Model):
     """Структурированный ответ для maintenance_history tool."""
 
     vin: str = Field(description='VIN номер автомобиля')
@@ -146,7 +201,7 @@ class MaintenanceHistoryStructured(BaseModel):
 # ============================================================================
 
 
-class VehicleRepairRecord(BaseModel):
+class VehicleRepairRecord(_Model):
     """Запись о ремонте из дилерской сети (DNM)."""
 
     dealer_name: str = Field(description='Название дилера')
@@ -157,7 +212,7 @@ class VehicleRepairRecord(BaseModel):
     recommendations: str = Field(description='Рекомендации дилера')
 
 
-class VehicleRepairsHistoryStructured(BaseModel):
+class VehicleRepairsHistoryStructured(_Model):
     """Структурированный ответ для vehicle_repairs_history tool."""
 
     vin: str = Field(description='VIN номер автомобиля')
@@ -177,7 +232,7 @@ class VehicleRepairsHistoryStructured(BaseModel):
 # ============================================================================
 
 
-class RAGDocument(BaseModel):
+class RAGDocument(_Model):
     """Документ из базы знаний."""
 
     content: str = Field(description='Содержимое документа')
@@ -191,7 +246,7 @@ class RAGDocument(BaseModel):
     )
 
 
-class ComplianceRAGStructured(BaseModel):
+class ComplianceRAGStructured(_Model):
     """Структурированный ответ для compliance_rag tool."""
 
     query: str = Field(description='Исходный запрос пользователя')
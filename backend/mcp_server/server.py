@@ -1,17 +1,24 @@
 """MCP Server для истории ремонтов и обслуживания автомобилей."""
 
 import asyncio
+import hashlib
 import httpx
+import orjson
+import re
 import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Any
 
+from cachetools import TTLCache
 from fastmcp import FastMCP
 from fastmcp.tools.tool import ToolResult
 from fastmcp.server.auth import StaticTokenVerifier
 from loguru import logger
 from mcp.types import TextContent
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 
 from mcp_server.models import (
     ComplianceRAGStructured,
@@ -37,7 +44,8 @@ from mcp_server.formatters import (
     format_compliance_rag_text,
 )
 
-from mcp_server.config import settings
+from mcp_server.cache import RedisResponseCache
+from mcp_server.config import settings, MCPTools
 
 
 # ============================================================================
@@ -62,9 +70,115 @@ if settings.mcp_auth_enabled:
     )
     logger.info('✅ Bearer token authentication enabled')
 
+# Заголовки backend API, вычисляются один раз при импорте
+_API_HEADERS = {'Authorization': f'Bearer {settings.api_key}'}
+
+# Модели из ответов backend API создаются без валидации (from_api)
+_TRUST_API = settings.trust_api_payloads
+
+# Общий HTTP клиент backend API: keep-alive пул вместо нового
+# TCP/TLS соединения на каждый запрос. По HTTPS с HTTP/2 параллельные
+# запросы инструментов мультиплексируются в одном соединении
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Получить общий HTTP клиент backend API (создается лениво)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # Транспорт повторяет попытку при сбое установки соединения
+        # (но не при ошибке ответа) - запрос не повторяется дважды
+        transport = httpx.AsyncHTTPTransport(
+            http2=settings.api_http2,
+            retries=2,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+            ),
+        )
+        _http_client = httpx.AsyncClient(
+            base_url=settings.api_url,
+            transport=transport,
+            timeout=30.0,
+            headers=_API_HEADERS,
+        )
+    return _http_client
+
+
+async def _warm_http_client() -> None:
+    """
+    Открыть соединение с backend API заранее.
+
+    DNS запрос и TCP/TLS рукопожатие выполняются при старте сервера,
+    а не при первом вызове инструмента: соединение остается в пуле.
+    Статус ответа не важен.
+    """
+    try:
+        await get_http_client().head('/')
+    except httpx.HTTPError as e:
+        logger.warning('Не удалось открыть соединение с backend API: {}', e)
+
+
+async def close_http_client() -> None:
+    """Закрыть общие HTTP клиенты backend API и RAG API."""
+    global _http_client, _rag_client
+    clients = (_http_client, _rag_client)
+    _http_client = _rag_client = None
+    for client in clients:
+        if client is not None:
+            await client.aclose()
+
+
+# Общий HTTP клиент сервера аутентификации и RAG API: соединения
+# с ними переиспользуются между вызовами compliance_rag
+_rag_client: httpx.AsyncClient | None = None
+
+
+def get_rag_client() -> httpx.AsyncClient:
+    """Получить общий HTTP клиент RAG API (создается лениво)."""
+    global _rag_client
+    if _rag_client is None or _rag_client.is_closed:
+        _rag_client = httpx.AsyncClient(
+            timeout=20.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+            ),
+        )
+    return _rag_client
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """
+    Жизненный цикл сервера: прогрев соединения с backend API,
+    фоновое обновление RAG токена и закрытие общих HTTP клиентов.
+    """
+    background = [asyncio.create_task(_warm_http_client())]
+    # Первое обновление токена заодно открывает соединение
+    # с сервером аутентификации
+    if _rag_auth_configured():
+        background.append(asyncio.create_task(_token_refresher()))
+    else:
+        logger.info(
+            'Аутентификация RAG не настроена: '
+            'фоновое обновление токена отключено'
+        )
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await close_http_client()
+        if _redis_cache is not None:
+            await _redis_cache.close()
+
+
 mcp = FastMCP(
     'Vehicle Repairs History MCP Server',
     auth=auth_provider,
+    lifespan=lifespan,
 )
 
 
@@ -73,15 +187,40 @@ mcp = FastMCP(
 # ============================================================================
 
 
+# Тело ответа health check не меняется: сериализуется один раз
+_HEALTH_BODY = b'{"status":"ok"}'
+
+
 @mcp.custom_route('/health', methods=['GET'])
-async def health_check(request: Request) -> JSONResponse:
+async def health_check(request: Request) -> Response:
     """Health check endpoint для Docker и мониторинга."""
-    return JSONResponse({'status': 'ok'})
+    return Response(content=_HEALTH_BODY, media_type='application/json')
 
 
-# Глобальные переменные для RAG
+# Глобальные переменные для RAG: access token и момент его
+# истечения по time.monotonic
 _access_token: str | None = None
-_access_token_lock = asyncio.Lock()
+_access_token_expires_at = 0.0
+# Выполняющееся обновление токена, общее для всех ожидающих задач
+_token_refresh_task: asyncio.Task[str] | None = None
+# Токен обновляется заранее, за столько секунд до истечения
+_TOKEN_REFRESH_MARGIN = 30.0
+# Срок действия токена, если ответ не содержит expires_in
+_TOKEN_DEFAULT_TTL = 3600.0
+# Фоновое обновление выполняется за столько секунд до истечения -
+# раньше, чем обновление по запросу, поэтому вызовы не ждут токен
+_TOKEN_PREFETCH_MARGIN = 60.0
+# Пауза перед первым повтором после неудачного фонового обновления;
+# при следующих неудачах она удваивается до _TOKEN_RETRY_MAX_DELAY
+_TOKEN_RETRY_DELAY = 30.0
+_TOKEN_RETRY_MAX_DELAY = 600.0
+# Ответы сервера аутентификации, которые не исправятся повтором:
+# неверные учетные данные или запрос
+_TOKEN_FATAL_STATUSES = frozenset({400, 401, 403})
+
+
+class _TokenConfigError(RuntimeError):
+    """Ошибка настройки аутентификации RAG, повтор не поможет."""
 
 
 # ============================================================================
@@ -89,114 +228,280 @@ _access_token_lock = asyncio.Lock()
 # ============================================================================
 
 
-async def get_warranty_days(vin: str) -> dict[str, Any]:
-    """Получить статистику дней в ремонте по годам владения."""
-    url = f'{settings.api_url}/api/warranty/{vin}'
-    headers = {'Authorization': f'Bearer {settings.api_key}'}
+# Ошибки backend API, не зависящие от запроса (только для чтения)
+_ERROR_AUTH = {'error': 'Ошибка аутентификации'}
+_ERROR_TIMEOUT = {'error': 'Превышено время ожидания запроса'}
+# Те же ошибки для эндпоинтов, возвращающих список записей
+_ERROR_AUTH_LIST = [_ERROR_AUTH]
+_ERROR_TIMEOUT_LIST = [_ERROR_TIMEOUT]
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(url, headers=headers)
+# Списки записей: NDJSON, если backend его поддерживает, иначе JSON
+_NDJSON = 'application/x-ndjson'
+_RECORDS_HEADERS = {'Accept': f'{_NDJSON}, application/json'}
+
+# Допустимый VIN: 17 латинских букв (без I, O, Q) и цифр. Инструменты
+# приводят VIN к верхнему регистру до построения пути запроса
+_VIN_RE = re.compile(r'[A-HJ-NPR-Z0-9]{17}')
+
+
+def _normalize_vin(vin: str) -> str:
+    """
+    Привести VIN к каноническому виду: без пробелов по краям, в верхнем
+    регистре. Один VIN в разном регистре дает один путь запроса, а значит
+    общие записи в _inflight, _api_cache и Redis.
+    """
+    return vin.strip().upper()
+
+
+# Выполняющиеся GET запросы к backend API по пути запроса
+_inflight: dict[str, asyncio.Task[Any]] = {}
+# Успешные ответы backend API по пути запроса (ошибки не кэшируются).
+# История ремонтов за секунды не меняется, а агент часто запрашивает
+# один и тот же VIN повторно
+_api_cache: TTLCache[str, Any] | None = (
+    TTLCache(
+        maxsize=settings.api_cache_max,
+        ttl=settings.api_cache_ttl,
+        timer=time.monotonic,
+    )
+    if settings.api_cache_ttl
+    else None
+)
+# Общий для всех процессов кэш ответов в Redis (если задан api_redis_url)
+_redis_cache: RedisResponseCache | None = (
+    RedisResponseCache(settings.api_redis_url, settings.api_redis_stale_ttl)
+    if settings.api_redis_url
+    else None
+)
+
+
+async def _api_get(
+    path: str,
+    *,
+    vin: str,
+    list_on_error: bool = False,
+    empty_on_not_found: bool = False,
+) -> Any:
+    """
+    GET запрос к backend API с объединением одинаковых запросов.
+
+    Успешный ответ кэшируется на api_cache_ttl секунд. Пока запрос
+    по пути path выполняется, остальные вызовы с тем же путем ожидают
+    его результат, а не отправляют новый запрос. Параметры те же,
+    что у _fetch_cached. Возвращаемые данные общие - их нельзя изменять.
+    Некорректный VIN отклоняется без запроса к API.
+    """
+    if _VIN_RE.fullmatch(vin) is None:
+        logger.info('Некорректный VIN, запрос не выполняется: {}', vin)
+        error = {'error': f'Некорректный VIN: {vin}'}
+        return [error] if list_on_error else error
+
+    if _api_cache is not None:
+        cached = _api_cache.get(path)
+        if cached is not None:
+            return cached
+
+    task = _inflight.get(path)
+    if task is None:
+        task = asyncio.create_task(_fetch_cached(
+            path,
+            vin=vin,
+            list_on_error=list_on_error,
+            empty_on_not_found=empty_on_not_found,
+        ))
+        _inflight[path] = task
+        task.add_done_callback(lambda _: _inflight.pop(path, None))
+    # shield: отмена одного вызова не отменяет общий запрос
+    return await asyncio.shield(task)
+
+
+async def _fetch_cached(
+    path: str,
+    *,
+    vin: str,
+    list_on_error: bool = False,
+    empty_on_not_found: bool = False,
+) -> Any:
+    """
+    GET запрос к backend API через общий кэш в Redis.
+
+    Свежий ответ из Redis возвращается без запроса к API. Если API
+    вернул ошибку, а в Redis есть устаревший ответ, возвращается он.
+    Статистика и истории пополняются новыми ремонтами, поэтому ответы
+    API свежи только api_redis_short_ttl секунд. Параметры те же,
+    что у _fetch_api.
+    """
+    if _redis_cache is None:
+        return await _fetch_api(
+            path,
+            vin=vin,
+            list_on_error=list_on_error,
+            empty_on_not_found=empty_on_not_found,
+        )
+
+    stale = None
+    cached = await _redis_cache.get(path)
+    if cached is not None:
+        data, fresh = cached
+        if not fresh:
+            stale = data
+        else:
+            if _api_cache is not None:
+                _api_cache[path] = data
+            return data
+
+    data = await _fetch_api(
+        path,
+        vin=vin,
+        list_on_error=list_on_error,
+        empty_on_not_found=empty_on_not_found,
+    )
+    if _is_api_error(data):
+        if stale is not None:
+            logger.warning('Используется устаревший ответ из Redis: {}', path)
+            return stale
+        return data
+
+    await _redis_cache.set(path, data, settings.api_redis_short_ttl)
+    return data
+
+
+def _is_api_error(data: Any) -> bool:
+    """Является ли результат _fetch_api описанием ошибки."""
+    if isinstance(data, dict):
+        return 'error' in data
+    return bool(data) and isinstance(data[0], dict) and 'error' in data[0]
+
+
+async def _fetch_api(
+    path: str,
+    *,
+    vin: str,
+    list_on_error: bool = False,
+    empty_on_not_found: bool = False,
+) -> Any:
+    """
+    GET запрос к backend API с единой обработкой ошибок.
+
+    Args:
+        path: Путь запроса относительно settings.api_url
+        vin: VIN номер (для сообщений об ошибках)
+        list_on_error: Эндпоинт возвращает список записей: ответ
+            читается через _get_records, ошибка возвращается списком
+            из одного словаря
+        empty_on_not_found: Возвращать пустой список при 404
+
+    Returns:
+        JSON ответ API или описание ошибки {'error': ...}
+    """
+    try:
+        if list_on_error:
+            data = await _get_records(path)
+        else:
+            response = await get_http_client().get(path)
             response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f'HTTP error {e.response.status_code}: {e}')
-            if e.response.status_code == 404:
-                return {'error': f'VIN {vin} не найден'}
-            elif e.response.status_code == 401:
-                return {'error': 'Ошибка аутентификации'}
-            else:
-                return {'error': f'HTTP ошибка: {e.response.status_code}'}
-        except httpx.TimeoutException:
-            logger.error(f'Timeout при запросе к {url}')
-            return {'error': 'Превышено время ожидания запроса'}
-        except Exception as e:
-            logger.error(f'Ошибка при запросе к {url}: {e}')
-            return {'error': str(e)}
+            # orjson разбирает байты тела напрямую, без декодирования в str
+            data = orjson.loads(response.content)
+        if _api_cache is not None:
+            _api_cache[path] = data
+        return data
+    except httpx.HTTPStatusError as e:
+        status_code = e.response.status_code
+        if status_code == 404 and empty_on_not_found:
+            logger.info('VIN {} не найден: {}', vin, path)
+            return []
+        # Аргументы вместо f-строки: str(e) строится только если
+        # уровень не отфильтрован
+        logger.error('HTTP error {}: {}', status_code, e)
+        if status_code == 404:
+            error = {'error': f'VIN {vin} не найден'}
+        elif status_code == 401:
+            return _ERROR_AUTH_LIST if list_on_error else _ERROR_AUTH
+        else:
+            error = {'error': f'HTTP ошибка: {status_code}'}
+    except httpx.TimeoutException:
+        logger.error('Timeout при запросе к {}', path)
+        return _ERROR_TIMEOUT_LIST if list_on_error else _ERROR_TIMEOUT
+    except Exception as e:
+        logger.error('Ошибка при запросе к {}: {}', path, e)
+        error = {'error': str(e)}
+    return [error] if list_on_error else error
+
+
+async def _get_records(path: str) -> list[Any]:
+    """
+    GET запрос к эндпоинту, возвращающему список записей.
+
+    Если backend отдает список в NDJSON, записи разбираются по мере
+    получения строк, параллельно с загрузкой остальной части ответа.
+    Иначе ответ разбирается как обычный JSON массив.
+    """
+    async with get_http_client().stream(
+        'GET', path, headers=_RECORDS_HEADERS
+    ) as response:
+        response.raise_for_status()
+        content_type = response.headers.get('content-type', '')
+        if not content_type.startswith(_NDJSON):
+            return orjson.loads(await response.aread())
+        return [
+            orjson.loads(line)
+            async for line in response.aiter_lines()
+            if line
+        ]
+
+
+async def get_warranty_days(vin: str) -> dict[str, Any]:
+    """Получить статистику дней в ремонте по годам владения."""
+    return await _api_get(f'/api/warranty/{vin}', vin=vin)
 
 
 async def get_warranty_history(vin: str) -> dict[str, Any]:
     """Получить историю гарантийных обращений."""
-    url = f'{settings.api_url}/api/warranty/records/{vin}'
-    headers = {'Authorization': f'Bearer {settings.api_key}'}
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f'HTTP error {e.response.status_code}: {e}')
-            if e.response.status_code == 404:
-                return {'error': f'VIN {vin} не найден'}
-            elif e.response.status_code == 401:
-                return {'error': 'Ошибка аутентификации'}
-            else:
-                return {'error': f'HTTP ошибка: {e.response.status_code}'}
-        except httpx.TimeoutException:
-            logger.error(f'Timeout при запросе к {url}')
-            return {'error': 'Превышено время ожидания запроса'}
-        except Exception as e:
-            logger.error(f'Ошибка при запросе к {url}: {e}')
-            return {'error': str(e)}
+    return await _api_get(f'/api/warranty/records/{vin}', vin=vin)
 
 
 async def get_maintenance_history(vin: str) -> list[dict[str, Any]]:
     """Получить историю технического обслуживания."""
-    url = f'{settings.api_url}/api/maintenance/{vin}'
-    headers = {'Authorization': f'Bearer {settings.api_key}'}
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f'HTTP error {e.response.status_code}: {e}')
-            if e.response.status_code == 404:
-                return [{'error': f'VIN {vin} не найден'}]
-            elif e.response.status_code == 401:
-                return [{'error': 'Ошибка аутентификации'}]
-            else:
-                return [{'error': f'HTTP ошибка: {e.response.status_code}'}]
-        except httpx.TimeoutException:
-            logger.error(f'Timeout при запросе к {url}')
-            return [{'error': 'Превышено время ожидания запроса'}]
-        except Exception as e:
-            logger.error(f'Ошибка при запросе к {url}: {e}')
-            return [{'error': str(e)}]
+    return await _api_get(
+        f'/api/maintenance/{vin}', vin=vin, list_on_error=True
+    )
 
 
 async def get_vehicle_repairs_history(vin: str) -> list[dict[str, Any]]:
     """Получить историю ремонтов из дилерской сети (DNM records)."""
-    url = f'{settings.api_url}/api/dnm/{vin}'
-    headers = {'Authorization': f'Bearer {settings.api_key}'}
+    return await _api_get(
+        f'/api/dnm/{vin}',
+        vin=vin,
+        list_on_error=True,
+        empty_on_not_found=True,
+    )
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                logger.info(f'VIN {vin} не найден в DNM records')
-                return []
-            elif e.response.status_code == 401:
-                logger.error('Ошибка аутентификации API')
-                return [{'error': 'Ошибка аутентификации'}]
-            else:
-                logger.error(f'HTTP error {e.response.status_code}: {e}')
-                return [{'error': f'HTTP ошибка: {e.response.status_code}'}]
-        except httpx.TimeoutException:
-            logger.error(f'Timeout при запросе к {url}')
-            return [{'error': 'Превышено время ожидания запроса'}]
-        except Exception as e:
-            logger.error(f'Ошибка при запросе к {url}: {e}')
-            return [{'error': str(e)}]
 
+def _utc_iso() -> str:
+    """
+    Текущее время UTC в формате ISO 8601 с точностью до секунды.
 
+    f-строка вместо time.strftime: без разбора формата и учета локали.
+    """
+    t = time.gmtime()
+    return (
+        f'{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}'
+        f'T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z'
+    )
+
+
+def _elapsed_ms(start_time: float) -> int:
+    """Время с момента start_time (time.monotonic) в миллисекундах."""
+    return int((time.monotonic() - start_time) * 1000)
+
+
+@lru_cache(maxsize=64)
 def _parse_retrieve_limit(value: str | None, default: int = 6) -> int:
-    """Парсинг значения retrieve_limit с обработкой ошибок."""
+    """
+    Парсинг значения retrieve_limit с обработкой ошибок.
+
+    Функция чистая, а набор значений мал, поэтому результат кэшируется.
+    """
     if value is None:
         return default
     try:
@@ -208,40 +513,192 @@ def _parse_retrieve_limit(value: str | None, default: int = 6) -> int:
         return default
 
 
-async def get_access_token() -> str:
-    """Получение access token для RAG API."""
-    async with _access_token_lock:
-        global _access_token
+def _cached_access_token(stale_token: str | None) -> str | None:
+    """Действующий access token из кэша или None, если нужен новый."""
+    if (
+        _access_token is not None
+        and _access_token != stale_token
+        and time.monotonic()
+        < _access_token_expires_at - _TOKEN_REFRESH_MARGIN
+    ):
+        return _access_token
+    return None
+
+
+async def get_access_token(stale_token: str | None = None) -> str:
+    """
+    Получение access token для RAG API.
+
+    Токен кэшируется до истечения expires_in. Если нужен новый токен,
+    все задачи ожидают одно общее обновление: запрос к серверу
+    аутентификации не выполняется под блокировкой и не повторяется.
+
+    Args:
+        stale_token: Токен, отклоненный RAG API (401): он обновляется,
+            даже если срок действия еще не истек
+
+    Returns:
+        Действующий access token
+    """
+    token = _cached_access_token(stale_token)
+    if token is not None:
+        return token
+    # shield: отмена одного ожидающего не отменяет общее обновление
+    return await asyncio.shield(_shared_token_refresh())
+
+
+def _shared_token_refresh() -> asyncio.Task[str]:
+    """Текущее обновление токена или новое, если оно не выполняется."""
+    global _token_refresh_task
+    # Между проверкой и созданием задачи нет await - гонки нет
+    task = _token_refresh_task
+    if task is None:
+        task = asyncio.create_task(_refresh_access_token())
+        _token_refresh_task = task
+    return task
+
+
+def _rag_auth_configured() -> bool:
+    """Заданы ли учетные данные и URL аутентификации RAG."""
+    return bool(
+        settings.auth_url and settings.key_id and settings.key_secret
+    )
+
+
+async def _token_refresher() -> None:
+    """
+    Фоновое обновление access token до истечения срока действия.
+
+    Запускается в lifespan сервера, если аутентификация RAG настроена:
+    первый токен запрашивается при старте, следующие - за
+    _TOKEN_PREFETCH_MARGIN секунд до истечения. При ошибке пауза перед
+    повтором удваивается от _TOKEN_RETRY_DELAY до
+    _TOKEN_RETRY_MAX_DELAY; при ошибке настройки (_TokenConfigError)
+    фоновое обновление прекращается. Вызовы compliance_rag
+    по-прежнему могут обновить токен сами.
+    """
+    retry_delay = _TOKEN_RETRY_DELAY
+    while True:
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                token_response = await client.post(
-                    settings.auth_url,
-                    data={
-                        'grant_type': 'client_credentials',
-                        'client_id': settings.key_id,
-                        'client_secret': settings.key_secret,
-                    },
-                )
-                token_response.raise_for_status()
-                access_token = token_response.json().get('access_token')
-                if not access_token:
-                    raise ValueError(
-                        'Ответ аутентификации не содержит access_token'
-                    )
-                _access_token = access_token
-                return access_token
-        except httpx.HTTPStatusError as e:
-            raise RuntimeError(
-                f'Ошибка при получении access token. '
-                f'Статус: {e.response.status_code}; '
-                f'Сообщение: {e.response.text}'
+            await asyncio.shield(_shared_token_refresh())
+        except _TokenConfigError as e:
+            logger.error(
+                'Фоновое обновление RAG токена остановлено: {}', e
+            )
+            return
+        except RuntimeError as e:
+            logger.warning(
+                'Фоновое обновление RAG токена: {}; повтор через {} с',
+                e,
+                retry_delay,
+            )
+            delay = retry_delay
+            retry_delay = min(retry_delay * 2, _TOKEN_RETRY_MAX_DELAY)
+        else:
+            retry_delay = _TOKEN_RETRY_DELAY
+            delay = max(
+                _access_token_expires_at
+                - time.monotonic()
+                - _TOKEN_PREFETCH_MARGIN,
+                _TOKEN_RETRY_DELAY,
             )
-        except httpx.TimeoutException:
-            raise RuntimeError('Таймаут при получении access token.')
-        except httpx.RequestError as e:
-            raise RuntimeError(f'Сетевая ошибка аутентификации: {e}')
-        except Exception as e:
-            raise RuntimeError(f'Неожиданная ошибка аутентификации: {e}')
+        await asyncio.sleep(delay)
+
+
+async def _refresh_access_token() -> str:
+    """Запрос нового access token у сервера аутентификации."""
+    global _access_token, _access_token_expires_at, _token_refresh_task
+    try:
+        token_response = await get_rag_client().post(
+            settings.auth_url,
+            data={
+                'grant_type': 'client_credentials',
+                'client_id': settings.key_id,
+                'client_secret': settings.key_secret,
+            },
+            timeout=10.0,
+        )
+        token_response.raise_for_status()
+        token_data = token_response.json()
+        access_token = token_data.get('access_token')
+        if not access_token:
+            raise _TokenConfigError(
+                'Ответ аутентификации не содержит access_token'
+            )
+        expires_in = token_data.get('expires_in', _TOKEN_DEFAULT_TTL)
+        expires_at = time.monotonic() + float(expires_in)
+        _access_token = access_token
+        _access_token_expires_at = expires_at
+        return access_token
+    except _TokenConfigError:
+        raise
+    except httpx.HTTPStatusError as e:
+        error_cls = (
+            _TokenConfigError
+            if e.response.status_code in _TOKEN_FATAL_STATUSES
+            else RuntimeError
+        )
+        raise error_cls(
+            f'Ошибка при получении access token. '
+            f'Статус: {e.response.status_code}; '
+            f'Сообщение: {e.response.text}'
+        )
+    except ValueError as e:
+        # Тело не JSON (страница прокси или обслуживания) или неверный
+        # expires_in: ошибка временная, фоновое обновление повторится
+        raise RuntimeError(f'Некорректный ответ аутентификации: {e}')
+    except httpx.TimeoutException:
+        raise RuntimeError('Таймаут при получении access token.')
+    except httpx.RequestError as e:
+        raise RuntimeError(f'Сетевая ошибка аутентификации: {e}')
+    except Exception as e:
+        raise RuntimeError(f'Неожиданная ошибка аутентификации: {e}')
+    finally:
+        _token_refresh_task = None
+
+
+def _build_warranty_days(
+    vin: str,
+    data: dict[str, Any],
+) -> tuple[str, WarrantyDaysStructured]:
+    """
+    Построить текст и структурированные данные warranty_days.
+
+    Args:
+        vin: VIN номер автомобиля
+        data: Успешный ответ API статистики дней в ремонте
+
+    Returns:
+        Кортеж из (текстовое описание, структурированные данные)
+    """
+    repair_years = [
+        RepairYear.from_api(
+            trusted=_TRUST_API,
+            year_number=record['year_number'],
+            is_current_year=record['is_current_year'],
+            days_in_repair=record['days_in_repair']
+        )
+        for record in data.get('repair_data') or []
+    ]
+
+    current_year_days = next(
+        (r.days_in_repair for r in repair_years if r.is_current_year),
+        None
+    )
+
+    total_days = sum(r.days_in_repair for r in repair_years)
+
+    structured = WarrantyDaysStructured.from_api(
+        trusted=_TRUST_API,
+        vin=vin,
+        total_years=len(repair_years),
+        repair_years=repair_years,
+        current_year_days=current_year_days,
+        total_days_in_repair=total_days
+    )
+
+    text_summary = format_warranty_days_text(vin, repair_years, total_days)
+    return text_summary, structured
 
 
 # ============================================================================
@@ -249,6 +706,80 @@ async def get_access_token() -> str:
 # ============================================================================
 
 
+async def _warranty_days_result(vin: str) -> ToolResult:
+    """
+    Ответ warranty_days для одного VIN.
+
+    Общий для warranty_days и warranty_days_batch: ответ по VIN
+    в пакете совпадает с ответом отдельного вызова.
+    """
+    start_time = time.monotonic()
+    vin = _normalize_vin(vin)
+    logger.info(f'Tool warranty_days вызван с VIN: {vin}')
+    data = await get_warranty_days(vin)
+
+    # Обработка ошибок
+    if 'error' in data:
+        logger.error(f'warranty_days: ошибка для VIN {vin}: {data["error"]}')
+        return ToolResult(
+            content=[
+                TextContent(type='text', text=f'Ошибка: {data["error"]}')
+                ],
+            meta={
+                'vin': vin,
+                'error_type': 'api_error',
+                'execution_time_ms': _elapsed_ms(start_time)
+            }
+        )
+
+    # Нет данных
+    if not data.get('repair_data'):
+        logger.info(f'warranty_days: записи не найдены для VIN {vin}')
+        return ToolResult(
+            content=[
+                TextContent(
+                    type='text',
+                    text=f'Для VIN {vin}: записи не найдены'
+                )
+            ],
+            structured_content={
+                'vin': vin,
+                'total_years': 0,
+                'repair_years': [],
+                'current_year_days': None,
+                'total_days_in_repair': 0,
+            },
+            meta={
+                'vin': vin,
+                'data_source': 'warranty_api',
+                'execution_time_ms': _elapsed_ms(start_time),
+                'record_count': 0,
+                'timestamp': _utc_iso()
+            }
+        )
+
+    # Формируем структурированные данные и текстовое описание
+    text_summary, structured = _build_warranty_days(vin, data)
+
+    logger.info(
+        f'warranty_days: найдено {structured.total_years} записей '
+        f'для VIN {vin}'
+    )
+
+    return ToolResult(
+        content=[TextContent(type='text', text=text_summary)],
+        structured_content=structured.model_dump(),
+        meta={
+            'vin': vin,
+            'data_source': 'warranty_api',
+            'execution_time_ms': _elapsed_ms(start_time),
+            'record_count': structured.total_years,
+            'api_endpoint': settings.api_url,
+            'timestamp': _utc_iso()
+        }
+    )
+
+
 @mcp.tool(
     output_schema={
         'type': 'object',
@@ -312,96 +843,105 @@ async def warranty_days(vin: str) -> ToolResult:
         ToolResult с текстовым описанием, структурированными данными
         и метаданными выполнения
     """
-    start_time = time.time()
-    logger.info(f'Tool warranty_days вызван с VIN: {vin}')
-    data = await get_warranty_days(vin)
+    return await _warranty_days_result(vin)
 
-    # Обработка ошибок
-    if 'error' in data:
-        logger.error(f'warranty_days: ошибка для VIN {vin}: {data["error"]}')
-        return ToolResult(
-            content=[
-                TextContent(type='text', text=f'Ошибка: {data["error"]}')
-                ],
-            meta={
-                'vin': vin,
-                'error_type': 'api_error',
-                'execution_time_ms': int((time.time() - start_time) * 1000)
+
+@mcp.tool(
+    output_schema={
+        'type': 'object',
+        'properties': {
+            'results': {
+                'type': 'object',
+                'description': (
+                    'Результаты по каждому VIN (в верхнем регистре) в '
+                    'формате warranty_days: text, structured_content, '
+                    'meta и is_error'
+                ),
+                'additionalProperties': {'type': 'object'}
+            },
+            'total_vins': {
+                'type': 'integer',
+                'description': 'Количество обработанных VIN'
+            },
+            'error_count': {
+                'type': 'integer',
+                'description': 'Количество VIN, завершившихся ошибкой'
             }
-        )
+        },
+        'required': ['results', 'total_vins', 'error_count']
+    }
+)
+async def warranty_days_batch(vins: list[str]) -> ToolResult:
+    """
+    Получить статистику дней в ремонте сразу для нескольких автомобилей.
 
-    # Нет данных
-    if not data.get('repair_data'):
-        logger.info(f'warranty_days: записи не найдены для VIN {vin}')
-        structured = WarrantyDaysStructured(
-            vin=vin,
-            total_years=0,
-            repair_years=[],
-            current_year_days=None,
-            total_days_in_repair=0
+    Один вызов инструмента заменяет N вызовов warranty_days: запросы
+    к API выполняются параллельно на стороне сервера. Пакет больше
+    batch_max_vins VIN отклоняется целиком. Результаты возвращаются
+    по VIN в верхнем регистре, повторы в разном регистре объединяются.
+
+    Args:
+        vins: Список VIN номеров автомобилей
+
+    Returns:
+        ToolResult с текстовым описанием по каждому VIN, словарём
+        результатов в structured_content и метаданными выполнения
+    """
+    start_time = time.monotonic()
+    unique_vins = list(dict.fromkeys(map(_normalize_vin, vins)))
+    logger.info(
+        f'Tool warranty_days_batch вызван для {len(unique_vins)} VIN'
+    )
+    if len(unique_vins) > settings.batch_max_vins:
+        error_msg = (
+            f'Слишком много VIN в warranty_days_batch: {len(unique_vins)}, '
+            f'максимум {settings.batch_max_vins}'
         )
+        logger.error(f'warranty_days_batch: {error_msg}')
         return ToolResult(
-            content=[
-                TextContent(
-                    type='text',
-                    text=f'Для VIN {vin}: записи не найдены'
-                )
-            ],
-            structured_content=structured.model_dump(),
+            content=[TextContent(type='text', text=error_msg)],
             meta={
-                'vin': vin,
-                'data_source': 'warranty_api',
-                'execution_time_ms': int((time.time() - start_time) * 1000),
-                'record_count': 0,
-                'timestamp': time.strftime(
-                    '%Y-%m-%dT%H:%M:%SZ',
-                    time.gmtime()
-                )
+                'error_type': 'batch_too_large',
+                'execution_time_ms': _elapsed_ms(start_time),
+                'timestamp': _utc_iso()
             }
         )
 
-    # Формируем структурированные данные
-    repair_years = [
-        RepairYear(
-            year_number=record['year_number'],
-            is_current_year=record['is_current_year'],
-            days_in_repair=record['days_in_repair']
-        )
-        for record in data['repair_data']
-    ]
-
-    current_year_days = next(
-        (r.days_in_repair for r in repair_years if r.is_current_year),
-        None
+    responses = await asyncio.gather(
+        *(_warranty_days_result(vin) for vin in unique_vins)
     )
 
-    total_days = sum(r.days_in_repair for r in repair_years)
-
-    structured = WarrantyDaysStructured(
-        vin=vin,
-        total_years=len(repair_years),
-        repair_years=repair_years,
-        current_year_days=current_year_days,
-        total_days_in_repair=total_days
-    )
-
-    # Текстовое описание
-    text_summary = format_warranty_days_text(vin, repair_years, total_days)
-
-    logger.info(
-        f'warranty_days: найдено {len(repair_years)} записей для VIN {vin}'
-    )
+    results: dict[str, dict[str, Any]] = {}
+    texts = []
+    error_count = 0
+    for vin, result in zip(unique_vins, responses):
+        text_summary = '\n'.join(
+            block.text for block in result.content
+            if isinstance(block, TextContent)
+        )
+        is_error = bool(result.meta) and 'error_type' in result.meta
+        error_count += is_error
+        results[vin] = {
+            'text': text_summary,
+            'structured_content': result.structured_content,
+            'meta': result.meta,
+            'is_error': is_error,
+        }
+        texts.append(f'### VIN {vin}\n\n{text_summary}')
 
     return ToolResult(
-        content=[TextContent(type='text', text=text_summary)],
-        structured_content=structured.model_dump(),
+        content=[TextContent(type='text', text='\n\n'.join(texts))],
+        structured_content={
+            'results': results,
+            'total_vins': len(unique_vins),
+            'error_count': error_count,
+        },
         meta={
-            'vin': vin,
             'data_source': 'warranty_api',
-            'execution_time_ms': int((time.time() - start_time) * 1000),
-            'record_count': len(repair_years),
+            'execution_time_ms': _elapsed_ms(start_time),
+            'record_count': len(unique_vins),
             'api_endpoint': settings.api_url,
-            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            'timestamp': _utc_iso()
         }
     )
 
@@ -449,7 +989,8 @@ async def warranty_history(vin: str) -> ToolResult:
         ToolResult с текстовым описанием, структурированными данными
         и метаданными выполнения
     """
-    start_time = time.time()
+    start_time = time.monotonic()
+    vin = _normalize_vin(vin)
     logger.info(f'Tool warranty_history вызван с VIN: {vin}')
     data = await get_warranty_history(vin)
 
@@ -465,20 +1006,13 @@ async def warranty_history(vin: str) -> ToolResult:
             meta={
                 'vin': vin,
                 'error_type': 'api_error',
-                'execution_time_ms': int((time.time() - start_time) * 1000)
+                'execution_time_ms': _elapsed_ms(start_time)
             }
         )
 
     # Нет данных
     if not data.get('records'):
         logger.info(f'warranty_history: записи не найдены для VIN {vin}')
-        structured = WarrantyHistoryStructured(
-            vin=vin,
-            records=[],
-            total_records=0,
-            total_parts_replaced=0,
-            total_operations=0
-        )
         return ToolResult(
             content=[
                 TextContent(
@@ -486,16 +1020,19 @@ async def warranty_history(vin: str) -> ToolResult:
                     text=f'Для VIN {vin}: записи не найдены'
                 )
             ],
-            structured_content=structured.model_dump(),
+            structured_content={
+                'vin': vin,
+                'records': [],
+                'total_records': 0,
+                'total_parts_replaced': 0,
+                'total_operations': 0,
+            },
             meta={
                 'vin': vin,
                 'data_source': 'warranty_api',
-                'execution_time_ms': int((time.time() - start_time) * 1000),
+                'execution_time_ms': _elapsed_ms(start_time),
                 'record_count': 0,
-                'timestamp': time.strftime(
-                    '%Y-%m-%dT%H:%M:%SZ',
-                    time.gmtime()
-                )
+                'timestamp': _utc_iso()
             }
         )
 
@@ -506,7 +1043,8 @@ async def warranty_history(vin: str) -> ToolResult:
 
     for record in data['records']:
         replaced_parts = [
-            ReplacedPart(
+            ReplacedPart.from_api(
+                trusted=_TRUST_API,
                 part_number=part['replace_part'],
                 description=part['replace_part_descr']
             )
@@ -514,23 +1052,27 @@ async def warranty_history(vin: str) -> ToolResult:
         ]
 
         operations = [
-            Operation(
+            Operation.from_api(
+                trusted=_TRUST_API,
                 code=op['op_code'],
                 description=op['op_code_descr']
             )
             for op in record.get('op_codes', [])
         ]
 
-        warranty_record = WarrantyRecord(
+        warranty_record = WarrantyRecord.from_api(
+            trusted=_TRUST_API,
             serial=record['serial'],
             date=record['ro_open_date'],
             odometer=record['odometr'],
-            dealer=Dealer(
+            dealer=Dealer.from_api(
+                trusted=_TRUST_API,
                 name=record['dealer']['name'],
                 code=record['dealer'].get('code'),
                 city=record['dealer']['city']
             ),
-            fault_part=FaultPart(
+            fault_part=FaultPart.from_api(
+                trusted=_TRUST_API,
                 part_number=record['casual_part'],
                 description=record['casual_part_descr']
             ),
@@ -542,7 +1084,8 @@ async def warranty_history(vin: str) -> ToolResult:
         total_parts += len(replaced_parts)
         total_ops += len(operations)
 
-    structured = WarrantyHistoryStructured(
+    structured = WarrantyHistoryStructured.from_api(
+        trusted=_TRUST_API,
         vin=vin,
         records=warranty_records,
         total_records=len(warranty_records),
@@ -569,10 +1112,10 @@ async def warranty_history(vin: str) -> ToolResult:
         meta={
             'vin': vin,
             'data_source': 'warranty_api',
-            'execution_time_ms': int((time.time() - start_time) * 1000),
+            'execution_time_ms': _elapsed_ms(start_time),
             'record_count': len(warranty_records),
             'api_endpoint': settings.api_url,
-            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            'timestamp': _utc_iso()
         }
     )
 
@@ -611,7 +1154,8 @@ async def maintenance_history(vin: str) -> ToolResult:
         ToolResult с текстовым описанием, структурированными данными
         и метаданными выполнения
     """
-    start_time = time.time()
+    start_time = time.monotonic()
+    vin = _normalize_vin(vin)
     logger.info(f'Tool maintenance_history вызван с VIN: {vin}')
     data = await get_maintenance_history(vin)
 
@@ -627,19 +1171,13 @@ async def maintenance_history(vin: str) -> ToolResult:
             meta={
                 'vin': vin,
                 'error_type': 'api_error',
-                'execution_time_ms': int((time.time() - start_time) * 1000)
+                'execution_time_ms': _elapsed_ms(start_time)
             }
         )
 
     # Нет данных
     if not data:
         logger.info(f'maintenance_history: записи не найдены для VIN {vin}')
-        structured = MaintenanceHistoryStructured(
-            vin=vin,
-            records=[],
-            total_records=0,
-            maintenance_types=[]
-        )
         return ToolResult(
             content=[
                 TextContent(
@@ -647,27 +1185,31 @@ async def maintenance_history(vin: str) -> ToolResult:
                     text=f'Для VIN {vin}: записи не найдены'
                 )
             ],
-            structured_content=structured.model_dump(),
+            structured_content={
+                'vin': vin,
+                'records': [],
+                'total_records': 0,
+                'maintenance_types': [],
+            },
             meta={
                 'vin': vin,
                 'data_source': 'maintenance_api',
-                'execution_time_ms': int((time.time() - start_time) * 1000),
+                'execution_time_ms': _elapsed_ms(start_time),
                 'record_count': 0,
-                'timestamp': time.strftime(
-                    '%Y-%m-%dT%H:%M:%SZ',
-                    time.gmtime()
-                )
+                'timestamp': _utc_iso()
             }
         )
 
     # Обработка записей
     maintenance_records = [
-        MaintenanceRecord(
+        MaintenanceRecord.from_api(
+            trusted=_TRUST_API,
             vin=record['vin'],
             maintenance_type=record['maintenance_type'],
             date=record['ro_date'],
             odometer=record['odometer'],
-            dealer=Dealer(
+            dealer=Dealer.from_api(
+                trusted=_TRUST_API,
                 name=record['dealer']['name'],
                 code=record['dealer'].get('code'),
                 city=record['dealer']['city']
@@ -680,7 +1222,8 @@ async def maintenance_history(vin: str) -> ToolResult:
         set(record.maintenance_type for record in maintenance_records)
     )
 
-    structured = MaintenanceHistoryStructured(
+    structured = MaintenanceHistoryStructured.from_api(
+        trusted=_TRUST_API,
         vin=vin,
         records=maintenance_records,
         total_records=len(maintenance_records),
@@ -701,10 +1244,10 @@ async def maintenance_history(vin: str) -> ToolResult:
         meta={
             'vin': vin,
             'data_source': 'maintenance_api',
-            'execution_time_ms': int((time.time() - start_time) * 1000),
+            'execution_time_ms': _elapsed_ms(start_time),
             'record_count': len(maintenance_records),
             'api_endpoint': settings.api_url,
-            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            'timestamp': _utc_iso()
         }
     )
 
@@ -743,7 +1286,8 @@ async def vehicle_repairs_history(vin: str) -> ToolResult:
         ToolResult с текстовым описанием, структурированными данными
         и метаданными выполнения
     """
-    start_time = time.time()
+    start_time = time.monotonic()
+    vin = _normalize_vin(vin)
     logger.info(f'Tool vehicle_repairs_history вызван с VIN: {vin}')
     data = await get_vehicle_repairs_history(vin)
 
@@ -760,7 +1304,7 @@ async def vehicle_repairs_history(vin: str) -> ToolResult:
             meta={
                 'vin': vin,
                 'error_type': 'api_error',
-                'execution_time_ms': int((time.time() - start_time) * 1000)
+                'execution_time_ms': _elapsed_ms(start_time)
             }
         )
 
@@ -769,12 +1313,6 @@ async def vehicle_repairs_history(vin: str) -> ToolResult:
         logger.info(
             f'vehicle_repairs_history: записи не найдены для VIN {vin}'
         )
-        structured = VehicleRepairsHistoryStructured(
-            vin=vin,
-            records=[],
-            total_records=0,
-            repair_types=[]
-        )
         return ToolResult(
             content=[
                 TextContent(
@@ -782,22 +1320,25 @@ async def vehicle_repairs_history(vin: str) -> ToolResult:
                     text=f'Для VIN {vin}: записи не найдены'
                 )
             ],
-            structured_content=structured.model_dump(),
+            structured_content={
+                'vin': vin,
+                'records': [],
+                'total_records': 0,
+                'repair_types': [],
+            },
             meta={
                 'vin': vin,
                 'data_source': 'dnm_api',
-                'execution_time_ms': int((time.time() - start_time) * 1000),
+                'execution_time_ms': _elapsed_ms(start_time),
                 'record_count': 0,
-                'timestamp': time.strftime(
-                    '%Y-%m-%dT%H:%M:%SZ',
-                    time.gmtime()
-                )
+                'timestamp': _utc_iso()
             }
         )
 
     # Обработка записей
     repair_records = [
-        VehicleRepairRecord(
+        VehicleRepairRecord.from_api(
+            trusted=_TRUST_API,
             dealer_name=record['dealer_name'],
             date=record['ro_close_date'],
             odometer=record['odometer'],
@@ -810,7 +1351,8 @@ async def vehicle_repairs_history(vin: str) -> ToolResult:
 
     unique_types = list(set(record.repair_type for record in repair_records))
 
-    structured = VehicleRepairsHistoryStructured(
+    structured = VehicleRepairsHistoryStructured.from_api(
+        trusted=_TRUST_API,
         vin=vin,
         records=repair_records,
         total_records=len(repair_records),
@@ -831,10 +1373,10 @@ async def vehicle_repairs_history(vin: str) -> ToolResult:
         meta={
             'vin': vin,
             'data_source': 'dnm_api',
-            'execution_time_ms': int((time.time() - start_time) * 1000),
+            'execution_time_ms': _elapsed_ms(start_time),
             'record_count': len(repair_records),
             'api_endpoint': settings.api_url,
-            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            'timestamp': _utc_iso()
         }
     )
 
@@ -898,35 +1440,44 @@ async def compliance_rag(query: str) -> ToolResult:
         и метаданными выполнения. При ошибке возвращается ToolResult
         с is_error=True и описанием проблемы
     """
-    start_time = time.time()
+    start_time = time.monotonic()
     logger.info(f'Tool compliance_rag вызван с запросом: {query}')
 
     retrieve_limit = _parse_retrieve_limit(
         str(settings.retrieve_limit) if settings.retrieve_limit else None,
         default=3
     )
-    global _access_token
 
-    async def do_rag_request(access_token: str):
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            payload = {
-                'query': query,
-                'knowledge_base_version': settings.knowledge_base_version_id,
-                'retrieval_configuration': {
-                    'number_of_results': retrieve_limit,
-                    'retrieval_type': 'SEMANTIC'
-                }
-            }
-            return await client.post(
-                settings.retrieve_url_template,
-                json=payload,
-                headers={'Authorization': f'Bearer {access_token}'},
+    # Ответ базы знаний на тот же запрос берется из Redis
+    rag_cache_key = None
+    if _redis_cache is not None:
+        rag_cache_key = _rag_cache_key(query, retrieve_limit)
+        cached = await _redis_cache.get(rag_cache_key)
+        if cached is not None and cached[1]:
+            logger.info('compliance_rag: ответ из кэша для: {}', query)
+            return _compliance_rag_result(
+                query, cached[0], retrieve_limit, start_time
             )
 
+    payload = {
+        'query': query,
+        'knowledge_base_version': settings.knowledge_base_version_id,
+        'retrieval_configuration': {
+            'number_of_results': retrieve_limit,
+            'retrieval_type': 'SEMANTIC'
+        }
+    }
+
+    async def do_rag_request(access_token: str):
+        return await get_rag_client().post(
+            settings.retrieve_url_template,
+            json=payload,
+            headers={'Authorization': f'Bearer {access_token}'},
+        )
+
     # Попытка получить access token
     try:
-        if _access_token is None:
-            await get_access_token()
+        access_token = await get_access_token()
     except Exception as e:
         error_msg = f'Ошибка аутентификации: {str(e)}'
         logger.error(f'compliance_rag: {error_msg}')
@@ -935,16 +1486,16 @@ async def compliance_rag(query: str) -> ToolResult:
             meta={
                 'query': query,
                 'error_type': 'authentication_error',
-                'execution_time_ms': int((time.time() - start_time) * 1000),
-                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                'execution_time_ms': _elapsed_ms(start_time),
+                'timestamp': _utc_iso()
             }
         )
 
     try:
-        response = await do_rag_request(_access_token)
+        response = await do_rag_request(access_token)
         if response.status_code == 401:
-            await get_access_token()
-            response = await do_rag_request(_access_token)
+            access_token = await get_access_token(stale_token=access_token)
+            response = await do_rag_request(access_token)
             if response.status_code == 401:
                 error_msg = (
                     'Аутентификация не удалась: '
@@ -957,17 +1508,12 @@ async def compliance_rag(query: str) -> ToolResult:
                     meta={
                         'query': query,
                         'error_type': 'authentication_failed',
-                        'execution_time_ms': int(
-                            (time.time() - start_time) * 1000
-                        ),
-                        'timestamp': time.strftime(
-                            '%Y-%m-%dT%H:%M:%SZ',
-                            time.gmtime()
-                        )
+                        'execution_time_ms': _elapsed_ms(start_time),
+                        'timestamp': _utc_iso()
                     }
                 )
         response.raise_for_status()
-        retrieve_result = response.json()
+        retrieve_result = orjson.loads(response.content)
         logger.info(
             f'compliance_rag: успешно получен ответ от RAG API, '
             f'результатов: {len(retrieve_result.get("results", []))}'
@@ -990,8 +1536,8 @@ async def compliance_rag(query: str) -> ToolResult:
                 'query': query,
                 'error_type': 'http_error',
                 'http_status': status,
-                'execution_time_ms': int((time.time() - start_time) * 1000),
-                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                'execution_time_ms': _elapsed_ms(start_time),
+                'timestamp': _utc_iso()
             }
         )
     except httpx.TimeoutException:
@@ -1005,8 +1551,8 @@ async def compliance_rag(query: str) -> ToolResult:
             meta={
                 'query': query,
                 'error_type': 'timeout',
-                'execution_time_ms': int((time.time() - start_time) * 1000),
-                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                'execution_time_ms': _elapsed_ms(start_time),
+                'timestamp': _utc_iso()
             }
         )
     except httpx.RequestError as e:
@@ -1020,8 +1566,8 @@ async def compliance_rag(query: str) -> ToolResult:
             meta={
                 'query': query,
                 'error_type': 'network_error',
-                'execution_time_ms': int((time.time() - start_time) * 1000),
-                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                'execution_time_ms': _elapsed_ms(start_time),
+                'timestamp': _utc_iso()
             }
         )
     except Exception as e:
@@ -1035,11 +1581,38 @@ async def compliance_rag(query: str) -> ToolResult:
             meta={
                 'query': query,
                 'error_type': 'unexpected_error',
-                'execution_time_ms': int((time.time() - start_time) * 1000),
-                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                'execution_time_ms': _elapsed_ms(start_time),
+                'timestamp': _utc_iso()
             }
         )
 
+    if rag_cache_key is not None:
+        await _redis_cache.set(
+            rag_cache_key, retrieve_result, settings.api_redis_ttl
+        )
+    return _compliance_rag_result(
+        query, retrieve_result, retrieve_limit, start_time
+    )
+
+
+def _rag_cache_key(query: str, retrieve_limit: int) -> str:
+    """Ключ кэша ответа RAG API: дайджест запроса и параметров поиска."""
+    digest = hashlib.blake2b(
+        orjson.dumps(
+            [query, settings.knowledge_base_version_id, retrieve_limit]
+        ),
+        digest_size=16,
+    ).hexdigest()
+    return f'rag:{digest}'
+
+
+def _compliance_rag_result(
+    query: str,
+    retrieve_result: dict[str, Any],
+    retrieve_limit: int,
+    start_time: float,
+) -> ToolResult:
+    """Построение ToolResult compliance_rag из ответа RAG API."""
     # Обработка результатов
     results = retrieve_result.get('results', [])
     documents = [
@@ -1072,14 +1645,139 @@ async def compliance_rag(query: str) -> ToolResult:
             'query': query,
             'knowledge_base_version': settings.knowledge_base_version_id,
             'retrieval_limit': retrieve_limit,
-            'execution_time_ms': int((time.time() - start_time) * 1000),
+            'execution_time_ms': _elapsed_ms(start_time),
             'api_endpoint': settings.retrieve_url_template,
             'document_count': len(documents),
-            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            'timestamp': _utc_iso()
         }
     )
 
 
+# Инструменты, доступные через batch_call
+_BATCHABLE_TOOLS = {
+    MCPTools.WARRANTY_DAYS: warranty_days,
+    MCPTools.WARRANTY_HISTORY: warranty_history,
+    MCPTools.MAINTENANCE_HISTORY: maintenance_history,
+    MCPTools.VEHICLE_REPAIRS_HISTORY: vehicle_repairs_history,
+    MCPTools.COMPLIANCE_RAG: compliance_rag,
+}
+
+
+async def _run_batch_item(call: dict[str, Any]) -> dict[str, Any]:
+    """
+    Выполнение одного вызова из batch_call.
+
+    Ошибка инструмента - исключение или ответ с meta.error_type
+    (ошибка backend API) - помечается флагом is_error.
+    """
+    tool_name = call.get('tool')
+    tool = _BATCHABLE_TOOLS.get(tool_name)
+    if tool is None:
+        return {
+            'tool': tool_name,
+            'error': f'Unknown tool: {tool_name}',
+            'is_error': True,
+        }
+
+    try:
+        result = await tool.run(call.get('arguments') or {})
+    except Exception as e:
+        logger.error(f'batch_call: ошибка инструмента {tool_name}: {e}')
+        return {'tool': tool_name, 'error': str(e), 'is_error': True}
+
+    return {
+        'tool': tool_name,
+        'text': '\n'.join(
+            block.text for block in result.content
+            if isinstance(block, TextContent)
+        ),
+        'structured_content': result.structured_content,
+        'meta': result.meta,
+        'is_error': bool(result.meta) and 'error_type' in result.meta,
+    }
+
+
+@mcp.tool(
+    output_schema={
+        'type': 'object',
+        'properties': {
+            'results': {
+                'type': 'array',
+                'description': (
+                    'Результаты вызовов в порядке запроса: tool, text, '
+                    'structured_content, meta или error, а также is_error'
+                ),
+                'items': {'type': 'object'}
+            },
+            'total_calls': {
+                'type': 'integer',
+                'description': 'Количество вызовов в пачке'
+            },
+            'error_count': {
+                'type': 'integer',
+                'description': 'Количество вызовов, завершившихся ошибкой'
+            }
+        },
+        'required': ['results', 'total_calls', 'error_count']
+    }
+)
+async def batch_call(calls: list[dict[str, Any]]) -> ToolResult:
+    """
+    Выполнить несколько вызовов инструментов за один запрос.
+
+    Вызовы выполняются параллельно; ошибка одного вызова не прерывает
+    остальные. Используется клиентом для объединения близких по времени
+    вызовов в один round trip. Пачка больше batch_max_calls вызовов
+    отклоняется целиком.
+
+    Args:
+        calls: Список вызовов вида {"tool": имя, "arguments": {...}}
+
+    Returns:
+        ToolResult со списком результатов в structured_content
+    """
+    start_time = time.monotonic()
+    logger.info(f'Tool batch_call вызван для {len(calls)} вызовов')
+    if len(calls) > settings.batch_max_calls:
+        error_msg = (
+            f'Слишком много вызовов в batch_call: {len(calls)}, '
+            f'максимум {settings.batch_max_calls}'
+        )
+        logger.error(f'batch_call: {error_msg}')
+        return ToolResult(
+            content=[TextContent(type='text', text=error_msg)],
+            meta={
+                'error_type': 'batch_too_large',
+                'execution_time_ms': _elapsed_ms(start_time),
+                'timestamp': _utc_iso()
+            }
+        )
+
+    results = await asyncio.gather(*(_run_batch_item(c) for c in calls))
+    error_count = sum(1 for item in results if item['is_error'])
+
+    return ToolResult(
+        content=[
+            TextContent(
+                type='text',
+                text=(
+                    f'Выполнено вызовов: {len(results)}, '
+                    f'с ошибкой: {error_count}'
+                )
+            )
+        ],
+        structured_content={
+            'results': results,
+            'total_calls': len(results),
+            'error_count': error_count,
+        },
+        meta={
+            'execution_time_ms': _elapsed_ms(start_time),
+            'record_count': len(results),
+            'timestamp': _utc_iso()
+        }
+    )
+
 # ============================================================================
 # Запуск сервера
 # ============================================================================
@@ -1088,6 +1786,14 @@ async def compliance_rag(query: str) -> ToolResult:
 if __name__ == '__main__':
     import signal
     import sys
+    from functools import partial
+
+    import anyio
+
+    try:
+        import uvloop
+    except ImportError:  # uvloop недоступен на Windows
+        uvloop = None
 
     def signal_handler(sig, frame):
         """Обработчик сигналов для graceful shutdown."""
@@ -1111,10 +1817,18 @@ if __name__ == '__main__':
     print()
     print('🛠️  Доступные инструменты:')
     print('   - warranty_days(vin) - статистика дней в ремонте по годам')
+    print(
+        '   - warranty_days_batch(vins) - статистика дней в ремонте '
+        'для нескольких VIN'
+    )
     print('   - warranty_history(vin) - история гарантийных обращений')
     print('   - maintenance_history(vin) - история техобслуживания')
     print('   - vehicle_repairs_history(vin) - история ремонтов DNM')
     print('   - compliance_rag(query) - поиск в базе знаний')
+    print(
+        '   - batch_call(calls) - несколько вызовов инструментов '
+        'за один запрос'
+    )
     print()
     print(f'🔑 Backend API: {settings.api_url}')
     print()
@@ -1140,11 +1854,20 @@ if __name__ == '__main__':
     print()
 
     try:
-        # Запуск сервера
-        mcp.run(
-            transport=settings.mcp_transport,
-            host=settings.mcp_server_host,
-            port=settings.mcp_server_port
+        # Запуск сервера: на uvloop, если он установлен
+        backend_options = (
+            {'loop_factory': uvloop.new_event_loop}
+            if uvloop is not None
+            else {}
+        )
+        anyio.run(
+            partial(
+                mcp.run_async,
+                transport=settings.mcp_transport,
+                host=settings.mcp_server_host,
+                port=settings.mcp_server_port,
+            ),
+            backend_options=backend_options,
         )
     except KeyboardInterrupt:
         print('\n🛑 Сервер остановлен')